@@ -2,8 +2,11 @@
 Django settings for gearguard project.
 """
 
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,13 +36,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'maintenance.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'maintenance.routers.ReplicaRoutingMiddleware',
+    'maintenance.singleflight.SingleFlightMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'maintenance.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'gearguard.urls'
@@ -71,6 +78,21 @@ DATABASES = {
     }
 }
 
+# Read replica: add a second alias to DATABASES and name it here to send safe
+# API reads there. For local testing, a second SQLite file such as
+#   'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'db_replica.sqlite3'}
+# can be refreshed from default with `python manage.py sync_replica`.
+# None keeps every query on default.
+REPLICA_DATABASE = None
+REPLICA_ROUTED_PATHS = ['/api/']
+REPLICA_STICKY_SECONDS = 5  # after a client writes, its reads stay on default this long
+
+# Optional per-site databases: site code -> alias in DATABASES. Requests scoped
+# to a mapped site (X-Site header or ?site=) use only that database.
+SITE_DATABASES = {}
+
+DATABASE_ROUTERS = ['maintenance.routers.DatabaseRouter']
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,7 +134,76 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'maintenance.throttling.ClientRateThrottle',
+        'maintenance.throttling.RouteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Token buckets: 'N/period' allows bursts of N, refilled at N per period
+        'client': '1200/min',
+        'request-list': '300/min',
+        'calendar-list': '120/min',
+    },
+    # Reverse proxies in front of the app that append to X-Forwarded-For. Anonymous
+    # clients are identified by the address the outermost trusted proxy saw; 0 uses
+    # REMOTE_ADDR and ignores the header, which clients can set to anything
+    'NUM_PROXIES': 0,
 }
 
+# Path to a SQLite file for throttle buckets shared by all workers on a host;
+# None keeps buckets in each process's memory
+THROTTLE_STORE = None
+
+# Start the server with GEARGUARD_THROTTLING=off to turn throttling off, e.g. for
+# load tests, where every virtual client shares one address
+THROTTLE_ENABLED = os.environ.get('GEARGUARD_THROTTLING', 'on') != 'off'
+
 # CORS settings (for hackathon - wide open)
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = [*default_headers, 'if-match', 'x-site', 'x-profile', 'x-profile-mode']
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Profile-Id']
+
+# Request change feed (Server-Sent Events are served under ASGI only)
+EVENT_STREAM_POLL_INTERVAL = 1.0  # seconds between checks for new events
+EVENT_STREAM_HEARTBEAT = 15  # seconds of silence before a keepalive comment
+EVENT_STREAM_MAX_DURATION = 300  # seconds before the client is asked to reconnect
+EVENT_FEED_COMMIT_LAG = 2  # seconds events are held back so out-of-order commits (PostgreSQL) are not skipped; 0 is safe on SQLite
+
+# Response compression (zstd and br need the optional zstandard / brotli packages)
+COMPRESSION_MIN_SIZE = 1024  # bytes; smaller bodies are sent uncompressed
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+# Single-flight coalescing of identical concurrent GETs (per worker process; writes
+# are stamped in the cache, so share it between workers)
+SINGLE_FLIGHT_PATHS = ['/api/calendar/', '/api/requests/', '/api/equipment/', '/api/users/', '/api/analytics/', '/api/capacity/']
+SINGLE_FLIGHT_TIMEOUT = 10  # seconds a waiting request allows before computing its own response
+
+# Capacity forecast: working hours per technician per weekday
+CAPACITY_HOURS_PER_DAY = 8
+
+# On-demand request profiling. Off removes the middleware entirely. When on, requests
+# send X-Profile: <PROFILING_TOKEN> (or come from a staff session), or match a
+# ProfileTarget armed in the admin
+PROFILING_ENABLED = False
+PROFILING_TOKEN = None  # None accepts the header only from staff sessions
+PROFILING_PATHS = ['/api/']
+PROFILING_REFRESH_SECONDS = 5  # how often each worker re-reads armed targets
+PROFILING_SAMPLE_INTERVAL = 0.001  # seconds between stack samples in sample mode
+PROFILING_MAX_QUERIES = 500  # slowest SQL statements kept per profile
+
+# Equipment facet counts: seconds a cached count may live; writes through the ORM invalidate sooner
+EQUIPMENT_FACET_CACHE_SECONDS = 3600
+
+# Worker warm-up (gearguard/wsgi.py, asgi.py): build routes and serializers, connect to the
+# databases, prime caches and GET these paths before serving, so first requests run warm
+WARMUP_ENABLED = True
+WARMUP_PATHS = ['/api/requests/', '/api/equipment/']
+
+# Overdue requests: minutes past scheduled_date + duration before a request counts as overdue
+OVERDUE_GRACE_MINUTES = 0
+
+# Background jobs (python manage.py run_worker)
+JOB_POLL_INTERVAL = 1.0  # seconds between polls of an empty queue
+JOB_RETRY_BACKOFF = 30  # seconds before the first retry; doubles with each attempt
+JOB_LEASE_TIMEOUT = 300  # seconds without a worker heartbeat before a running job is requeued
+JOB_PROGRESS_INTERVAL = 1.0  # minimum seconds between progress writes
@@ -3,9 +3,15 @@ WSGI config for gearguard project.
 """
 
 import os
+import time
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gearguard.settings')
 
+started_at = time.perf_counter()
 application = get_wsgi_application()
+
+from maintenance.warmup import warm_up  # noqa: E402 - needs the app registry set up above
+
+warm_up(application, started_at)
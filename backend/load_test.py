@@ -0,0 +1,466 @@
+"""
+Load generator for GearGuard
+Simulates concurrent technicians against a running server and reports
+throughput, latency histograms and error rates at increasing concurrency
+
+    python load_test.py --start-server --levels 10,25,50,100,200 --duration 20
+
+Each virtual technician keeps one keep-alive connection and loops over a
+weighted mix of reads, status changes, assignments and new requests. Write
+actions modify the target database, so point the server at a copy (or pass
+--no-writes).
+
+All technicians connect from one address and share its throttle buckets, so
+with throttling on, 429s measure the rate limit rather than capacity. Pass
+--no-throttle with --start-server, or start your own server with
+GEARGUARD_THROTTLING=off, to measure capacity.
+
+The saturation point is the first level whose throughput gain over the
+previous level drops below --min-gain, or whose error rate exceeds
+--max-error-rate.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')]
+
+# action -> weight in the traffic mix
+READ_MIX = {
+    'list_requests': 25,
+    'get_request': 20,
+    'board': 10,
+    'list_equipment': 10,
+    'calendar': 5,
+    'overdue': 5,
+}
+WRITE_MIX = {
+    'change_status': 12,
+    'assign': 8,
+    'create_request': 5,
+}
+
+NEXT_STATUS = {'NEW': 'IN_PROGRESS', 'IN_PROGRESS': 'REPAIRED'}
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Send a request and return (status, body bytes)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(data).encode() if data is not None else b''
+        head = (
+            f'{method} {path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            'Accept: application/json\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            '\r\n'
+        )
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Server closed the connection')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            content = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            content = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                content += chunk[:-2]
+        else:
+            content = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, content
+
+
+class Workload:
+    """IDs the technicians act on, loaded from the API before the run."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.equipment_ids = [e['id'] for e in self.get_all('/api/equipment/')]
+        self.team_members = {
+            team['id']: [member['id'] for member in team['members']]
+            for team in self.get_all('/api/teams/')
+        }
+        self.open_requests = {}
+        for status in NEXT_STATUS:
+            for item in self.get_all(f'/api/requests/?status={status}', pages=5):
+                self.open_requests[item['id']] = item
+        self.request_ids = list(self.open_requests) or [
+            item['id'] for item in self.get_all('/api/requests/', pages=2)
+        ]
+        if not self.equipment_ids or not self.request_ids:
+            sys.exit('No equipment or requests to work on; run `python manage.py seed_data` first.')
+        with urllib.request.urlopen(f'{base_url}/api/requests/', timeout=30) as response:
+            page = json.loads(response.read())
+        self.request_pages = max(1, min(5, -(-page['count'] // max(len(page['results']), 1))))
+
+    def get_all(self, path, pages=20):
+        """Follow pagination for a list endpoint, up to the given number of pages."""
+        items = []
+        url = self.base_url + path
+        for _ in range(pages):
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = json.loads(response.read())
+            if isinstance(data, list):
+                return data
+            items.extend(data['results'])
+            url = data.get('next')
+            if not url:
+                break
+        return items
+
+    def pick_open(self):
+        """A random open request with its last known status, or None."""
+        if not self.open_requests:
+            return None
+        return random.choice(list(self.open_requests.values()))
+
+
+async def run_action(action, conn, workload):
+    """Perform one action of the mix. Returns (status, body)."""
+    if action == 'list_requests':
+        return await conn.request('GET', f'/api/requests/?page={random.randint(1, workload.request_pages)}')
+    if action == 'get_request':
+        return await conn.request('GET', f'/api/requests/{random.choice(workload.request_ids)}/')
+    if action == 'board':
+        return await conn.request('GET', '/api/requests/board/?limit=20')
+    if action == 'list_equipment':
+        return await conn.request('GET', '/api/equipment/')
+    if action == 'calendar':
+        return await conn.request('GET', '/api/calendar/')
+    if action == 'overdue':
+        return await conn.request('GET', '/api/requests/overdue/')
+
+    if action == 'create_request':
+        scheduled = datetime.now(timezone.utc) + timedelta(days=random.randint(-3, 30))
+        status, body = await conn.request('POST', '/api/requests/', {
+            'subject': 'Load test request',
+            'equipment': random.choice(workload.equipment_ids),
+            'request_type': random.choice(['CORRECTIVE', 'PREVENTIVE']),
+            'scheduled_date': scheduled.isoformat(),
+            'duration': '02:00:00',
+        })
+        if status == 201:
+            item = json.loads(body)
+            workload.open_requests[item['id']] = item
+            workload.request_ids.append(item['id'])
+        return status, body
+
+    item = workload.pick_open()
+    if item is None:
+        return await conn.request('GET', '/api/requests/')
+    if action == 'change_status':
+        status, body = await conn.request(
+            'POST', f'/api/requests/{item["id"]}/status/', {'status': NEXT_STATUS[item['status']]}
+        )
+    else:
+        members = workload.team_members.get(item.get('team')) or []
+        if not members:
+            return await conn.request('GET', f'/api/requests/{item["id"]}/')
+        status, body = await conn.request(
+            'POST', f'/api/requests/{item["id"]}/assign/', {'technician': random.choice(members)}
+        )
+    if status == 200:
+        updated = json.loads(body)
+        if updated['status'] in NEXT_STATUS:
+            workload.open_requests[item['id']] = updated
+        else:
+            workload.open_requests.pop(item['id'], None)
+    elif status == 400:
+        # Another technician moved it first; forget the stale copy
+        workload.open_requests.pop(item['id'], None)
+    return status, body
+
+
+def classify(status, body):
+    """Outcome bucket for a response."""
+    if 200 <= status < 300:
+        return 'ok'
+    if status == 429:
+        return 'throttled'
+    if status in (400, 409, 412):
+        return 'conflict'
+    if status >= 500 and b'database is locked' in body:
+        return 'sqlite_locked'
+    if status >= 500:
+        return 'server_error'
+    return f'http_{status}'
+
+
+class LevelResult:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.latencies = []
+        self.outcomes = Counter()
+        self.by_action = defaultdict(list)
+        self.elapsed = 0.0
+
+    def record(self, action, outcome, latency_ms):
+        self.outcomes[outcome] += 1
+        if outcome not in ('connection_error', 'timeout'):
+            self.latencies.append(latency_ms)
+            self.by_action[action].append(latency_ms)
+
+    @property
+    def total(self):
+        return sum(self.outcomes.values())
+
+    @property
+    def throughput(self):
+        return self.outcomes['ok'] / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self):
+        errors = self.total - self.outcomes['ok'] - self.outcomes['conflict']
+        return errors / self.total if self.total else 0.0
+
+    def percentile(self, p, values=None):
+        values = sorted(self.latencies if values is None else values)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+    def summary(self):
+        return {
+            'concurrency': self.concurrency,
+            'requests': self.total,
+            'throughput_rps': round(self.throughput, 1),
+            'error_rate': round(self.error_rate, 4),
+            'outcomes': dict(self.outcomes),
+            'latency_ms': {f'p{p}': round(self.percentile(p), 1) for p in (50, 90, 99)},
+            'histogram': histogram(self.latencies),
+            'actions': {
+                action: {
+                    'count': len(values),
+                    'p50_ms': round(self.percentile(50, values), 1),
+                    'p99_ms': round(self.percentile(99, values), 1),
+                }
+                for action, values in sorted(self.by_action.items())
+            },
+        }
+
+
+def histogram(latencies):
+    """Counts per latency bucket, labelled by the bucket's upper bound."""
+    counts = Counter(next(bound for bound in HISTOGRAM_BUCKETS if latency <= bound) for latency in latencies)
+    return {
+        (f'<={bound}ms' if bound != float('inf') else f'>{HISTOGRAM_BUCKETS[-2]}ms'): counts[bound]
+        for bound in HISTOGRAM_BUCKETS
+    }
+
+
+async def technician(index, deadline, host, port, workload, mix, think_time, timeout, result):
+    """One virtual technician looping over the mix until the deadline."""
+    conn = Connection(host, port)
+    actions, weights = list(mix), list(mix.values())
+    try:
+        while time.monotonic() < deadline:
+            action = random.choices(actions, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, body = await asyncio.wait_for(run_action(action, conn, workload), timeout)
+                outcome = classify(status, body)
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                await conn.close()
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                outcome = 'connection_error'
+                await conn.close()
+            result.record(action, outcome, (time.perf_counter() - started) * 1000)
+            if think_time:
+                await asyncio.sleep(random.expovariate(1 / think_time))
+    finally:
+        await conn.close()
+
+
+async def run_level(concurrency, duration, host, port, workload, mix, think_time, timeout):
+    result = LevelResult(concurrency)
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*(
+        technician(i, deadline, host, port, workload, mix, think_time, timeout, result)
+        for i in range(concurrency)
+    ))
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def find_saturation(results, min_gain, max_error_rate):
+    """First level that adds too little throughput or fails too often, or None."""
+    previous = None
+    for result in results:
+        if result.error_rate > max_error_rate:
+            return result, f'error rate {result.error_rate:.1%} > {max_error_rate:.1%}'
+        if previous is not None and previous.throughput:
+            gain = result.throughput / previous.throughput - 1
+            if gain < min_gain:
+                return result, f'throughput gain {gain:+.1%} < {min_gain:.0%}'
+        previous = result
+    return None, None
+
+
+def print_level(result):
+    summary = result.summary()
+    latency = summary['latency_ms']
+    print(f"\n▶ Concurrency {result.concurrency}: {summary['requests']} requests, "
+          f"{summary['throughput_rps']} ok/s, errors {result.error_rate:.2%}")
+    print(f"  Latency p50 {latency['p50']}ms  p90 {latency['p90']}ms  p99 {latency['p99']}ms")
+    print(f"  Outcomes: {', '.join(f'{k}={v}' for k, v in sorted(result.outcomes.items()))}")
+    peak = max(summary['histogram'].values()) or 1
+    for label, count in summary['histogram'].items():
+        print(f"  {label:>9} {'█' * round(40 * count / peak):<40} {count}")
+
+
+def start_server(port, throttling=True):
+    """Start the development server on the given port and wait until it answers."""
+    manage = Path(__file__).parent / 'manage.py'
+    env = dict(os.environ)
+    if not throttling:
+        env['GEARGUARD_THROTTLING'] = 'off'
+    process = subprocess.Popen(
+        [sys.executable, str(manage), 'runserver', f'127.0.0.1:{port}', '--noreload'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/', timeout=1)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                sys.exit('Server exited during startup')
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit('Server did not start within 20 seconds')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start manage.py runserver on the base URL port for the run')
+    parser.add_argument('--levels', default='10,25,50,100,200',
+                        help='Comma-separated concurrency levels (default: 10,25,50,100,200)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per level (default: 20)')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help='Mean seconds a technician waits between actions (default: 0)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--no-writes', action='store_true', help='Only send reads')
+    parser.add_argument('--no-throttle', action='store_true',
+                        help='Start the server with throttling off (GEARGUARD_THROTTLING=off); needs --start-server')
+    parser.add_argument('--min-gain', type=float, default=0.10,
+                        help='Throughput gain below which a level counts as saturated (default: 0.10)')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Error rate above which a level counts as saturated (default: 0.01)')
+    parser.add_argument('--json', help='Also write the full results to this file')
+    args = parser.parse_args()
+
+    if args.no_throttle and not args.start_server:
+        parser.error('--no-throttle needs --start-server; start your own server with GEARGUARD_THROTTLING=off')
+
+    url = urlsplit(args.base_url)
+    host, port = url.hostname, url.port or 80
+    levels = [int(level) for level in args.levels.split(',')]
+    mix = dict(READ_MIX) if args.no_writes else {**READ_MIX, **WRITE_MIX}
+
+    print("=" * 60)
+    print("GearGuard Load Test")
+    print("=" * 60)
+    server = start_server(port, throttling=not args.no_throttle) if args.start_server else None
+    try:
+        workload = Workload(args.base_url.rstrip('/'))
+        print(f"Target: {args.base_url}  levels: {levels}  {args.duration:g}s each")
+        print(f"Workload: {len(workload.equipment_ids)} equipment, {len(workload.open_requests)} open requests")
+
+        results = []
+        for concurrency in levels:
+            result = asyncio.run(run_level(
+                concurrency, args.duration, host, port, workload, mix, args.think_time, args.timeout
+            ))
+            results.append(result)
+            print_level(result)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"{'conc':>6} {'ok/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8} {'locked':>7} {'429':>6}")
+    for result in results:
+        print(f"{result.concurrency:>6} {result.throughput:>9.1f} {result.percentile(50):>9.1f} "
+              f"{result.percentile(99):>9.1f} {result.error_rate:>8.2%} "
+              f"{result.outcomes['sqlite_locked']:>7} {result.outcomes['throttled']:>6}")
+
+    peak = max(results, key=lambda r: r.throughput)
+    saturated, reason = find_saturation(results, args.min_gain, args.max_error_rate)
+    print(f"\nPeak throughput: {peak.throughput:.1f} ok/s at concurrency {peak.concurrency}")
+    if saturated:
+        print(f"Saturation point: concurrency {saturated.concurrency} ({reason})")
+    else:
+        print("Not saturated at the tested levels; try higher --levels")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'base_url': args.base_url,
+            'duration': args.duration,
+            'levels': [result.summary() for result in results],
+            'peak': {'concurrency': peak.concurrency, 'throughput_rps': round(peak.throughput, 1)},
+            'saturation': {'concurrency': saturated.concurrency, 'reason': reason} if saturated else None,
+        }, indent=2))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
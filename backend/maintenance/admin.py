@@ -1,26 +1,141 @@
 from django.contrib import admin
-from .models import Equipment, MaintenanceTeam, MaintenanceRequest
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import (
+    Site, Equipment, MaintenanceTeam, MaintenanceRequest, RequestEvent, Job, ProfileTarget, RequestProfile
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the database's row estimate for unfiltered changelists
+    on large tables instead of running COUNT(*).
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self.estimate_rows(queryset)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate_rows(queryset):
+        """Cheap table-size estimate, or None when the backend has none."""
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            elif connection.vendor == 'sqlite':
+                # Reads the last rowid from the table's B-tree; overcounts after deletes
+                cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+            else:
+                return None
+            row = cursor.fetchone()
+        return row[0] if row and row[0] is not None else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow without bound."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Site)
+class SiteAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'created_at']
+    search_fields = ['code', 'name']
 
 
 @admin.register(MaintenanceTeam)
 class MaintenanceTeamAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_at']
+    list_display = ['name', 'site', 'created_at']
+    list_filter = ['site']
     search_fields = ['name']
     filter_horizontal = ['members']
 
 
 @admin.register(Equipment)
-class EquipmentAdmin(admin.ModelAdmin):
+class EquipmentAdmin(LargeTableAdmin):
     list_display = ['name', 'serial_number', 'department_or_owner', 'location', 'is_usable', 'created_at']
-    list_filter = ['is_usable', 'default_team']
+    list_filter = ['site', 'is_usable', 'default_team', 'purchase_date']
+    # Matches the equipment_created index; the admin would otherwise append -pk itself
+    ordering = ['-created_at', '-id']
     search_fields = ['name', 'serial_number', 'department_or_owner']
-    date_hierarchy = 'purchase_date'
+    autocomplete_fields = ['default_team', 'default_technician']
 
 
 @admin.register(MaintenanceRequest)
-class MaintenanceRequestAdmin(admin.ModelAdmin):
+class MaintenanceRequestAdmin(LargeTableAdmin):
     list_display = ['subject', 'equipment', 'request_type', 'status', 'team', 'technician', 'scheduled_date']
-    list_filter = ['status', 'request_type', 'team']
+    list_select_related = ['equipment', 'team', 'technician']
+    list_filter = ['site', 'status', 'request_type', 'team', 'scheduled_date']
     search_fields = ['subject', 'equipment__name']
-    date_hierarchy = 'scheduled_date'
+    autocomplete_fields = ['equipment', 'team', 'technician', 'created_by']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(RequestEvent)
+class RequestEventAdmin(LargeTableAdmin):
+    list_display = ['id', 'request_id', 'event_type', 'from_status', 'to_status', 'technician', 'created_at']
+    list_select_related = ['technician']
+    list_filter = ['event_type']
+    readonly_fields = ['request', 'event_type', 'from_status', 'to_status', 'technician', 'actor', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = [
+        'kind', 'params', 'status', 'attempts', 'max_attempts', 'progress', 'result', 'error',
+        'run_after', 'locked_by', 'locked_at', 'created_at', 'started_at', 'finished_at'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ProfileTarget)
+class ProfileTargetAdmin(admin.ModelAdmin):
+    """Arm profiling of the next matching requests (needs PROFILING_ENABLED)."""
+    list_display = ['path', 'method', 'query_contains', 'mode', 'remaining', 'created_at']
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(LargeTableAdmin):
+    list_display = ['id', 'method', 'path', 'status_code', 'duration_ms', 'sql_count', 'sql_time_ms', 'created_at', 'download']
+    list_filter = ['mode', 'method']
+    search_fields = ['path']
+    exclude = ['stats', 'folded']
+    readonly_fields = [
+        'method', 'path', 'query_string', 'mode', 'status_code', 'duration_ms',
+        'sql_count', 'sql_time_ms', 'queries', 'created_at', 'download'
+    ]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('stats', 'folded')
+
+    @admin.display(description='Profile')
+    def download(self, obj):
+        return format_html('<a href="{}">Download</a>', reverse('profile-download', args=[obj.pk]))
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,286 @@
+"""
+Maintenance analytics served from the daily rollup tables.
+
+EquipmentDailyStats and TeamDailyStats are kept current by RequestEvent.record,
+so reads only touch one row per equipment/team per active day instead of the
+full MaintenanceRequest history. rebuild() recomputes both tables from the
+live and archived request tables of the current database; run it under
+routers.each_database() to cover every site database.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from . import routers
+from .models import (
+    MaintenanceRequest,
+    ArchivedMaintenanceRequest,
+    RequestEvent,
+    EquipmentDailyStats,
+    TeamDailyStats,
+)
+
+
+ROLLUP_MODELS = [EquipmentDailyStats, TeamDailyStats]
+
+# group_by -> (rollup model, grouping key, display name lookup)
+GROUPINGS = {
+    'equipment': (EquipmentDailyStats, 'equipment_id', 'equipment__name'),
+    'department': (EquipmentDailyStats, 'equipment__department_or_owner', None),
+    'location': (EquipmentDailyStats, 'equipment__location', None),
+    'team': (TeamDailyStats, 'team_id', 'team__name'),
+}
+
+
+# Requests whose events are read per batch when the event log is in another database
+EVENT_LOOKUP_BATCH = 500
+
+
+def _transition_time(to_status, alias):
+    """First logged transition of the outer request, stored in alias, to the given status."""
+    return Subquery(
+        RequestEvent.objects.filter(
+            routers.database_events(alias),
+            request=OuterRef('pk'),
+            event_type='STATUS_CHANGED',
+            to_status=to_status,
+        ).order_by('id').values('created_at')[:1]
+    )
+
+
+def _empty_row():
+    return {
+        'opened_count': 0,
+        'corrective_count': 0,
+        'preventive_count': 0,
+        'repaired_count': 0,
+        'scrapped_count': 0,
+        'repair_time_total': timedelta(),
+    }
+
+
+def _collect(model, ids=None):
+    """Aggregate live and archived history into {(dimension_id, day): counters}."""
+    rows = defaultdict(_empty_row)
+    for source in (MaintenanceRequest, ArchivedMaintenanceRequest):
+        requests = source.objects.exclude(**{f'{model.dimension}__isnull': True}).order_by()
+        if ids is not None:
+            requests = requests.filter(**{f'{model.dimension}_id__in': ids})
+        _collect_requests(rows, requests, model.dimension)
+    return rows
+
+
+def _collect_requests(rows, requests, dimension):
+    """Add one request table's opened/repaired/scrapped counts into rows."""
+    opened = (
+        requests.annotate(day=TruncDate('created_at'))
+        .values(dimension, 'day', 'request_type')
+        .annotate(count=Count('id'))
+    )
+    for row in opened:
+        counters = rows[(row[dimension], row['day'])]
+        counters['opened_count'] += row['count']
+        if row['request_type'] == 'PREVENTIVE':
+            counters['preventive_count'] += row['count']
+        else:
+            counters['corrective_count'] += row['count']
+
+    if requests.db != router.db_for_read(RequestEvent):
+        _collect_closures(rows, requests, dimension)
+        return
+
+    # Requests closed before the event log existed fall back to updated_at
+    repaired = (
+        requests.annotate(repaired_event_at=_transition_time('REPAIRED', requests.db))
+        .filter(Q(status='REPAIRED') | Q(repaired_event_at__isnull=False))
+        .annotate(repaired_at=Coalesce('repaired_event_at', 'updated_at'))
+        .annotate(
+            day=TruncDate('repaired_at'),
+            repair_time=ExpressionWrapper(F('repaired_at') - F('created_at'), output_field=DurationField()),
+        )
+        .values(dimension, 'day')
+        .annotate(count=Count('id'), total=Sum('repair_time'))
+    )
+    for row in repaired:
+        counters = rows[(row[dimension], row['day'])]
+        counters['repaired_count'] += row['count']
+        counters['repair_time_total'] += row['total'] or timedelta()
+
+    scrapped = (
+        requests.filter(status='SCRAP')
+        .annotate(day=TruncDate(Coalesce(_transition_time('SCRAP', requests.db), 'updated_at')))
+        .values(dimension, 'day')
+        .annotate(count=Count('id'))
+    )
+    for row in scrapped:
+        rows[(row[dimension], row['day'])]['scrapped_count'] += row['count']
+
+
+def _collect_closures(rows, requests, dimension):
+    """
+    Add repaired and scrapped counts for requests of a site database.
+
+    Their events are on default, out of reach of a subquery, so the first
+    REPAIRED and SCRAP transitions are read per batch of requests and
+    combined here the way _collect_requests() combines them in SQL.
+    """
+    events = RequestEvent.objects.filter(
+        routers.database_events(requests.db),
+        event_type='STATUS_CHANGED',
+        to_status__in=['REPAIRED', 'SCRAP'],
+    )
+    batch = requests.values_list('id', dimension, 'status', 'created_at', 'updated_at').order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(batch.filter(id__gt=last_id)[:EVENT_LOOKUP_BATCH])
+        if not chunk:
+            return
+        last_id = chunk[-1][0]
+        first = {}
+        for key in events.filter(request_id__in=[row[0] for row in chunk]).order_by('id').values_list(
+            'request_id', 'to_status', 'created_at'
+        ):
+            first.setdefault(key[:2], key[2])
+        for request_id, dimension_id, status, created_at, updated_at in chunk:
+            repaired_at = first.get((request_id, 'REPAIRED'))
+            if repaired_at or status == 'REPAIRED':
+                repaired_at = repaired_at or updated_at
+                counters = rows[(dimension_id, timezone.localdate(repaired_at))]
+                counters['repaired_count'] += 1
+                counters['repair_time_total'] += repaired_at - created_at
+            if status == 'SCRAP':
+                scrapped_at = first.get((request_id, 'SCRAP')) or updated_at
+                rows[(dimension_id, timezone.localdate(scrapped_at))]['scrapped_count'] += 1
+
+
+def rebuild(batch_size=1000):
+    """Recompute every rollup table from request history. Returns rows written per model."""
+    written = {}
+    with routers.atomic(*ROLLUP_MODELS):
+        for model in ROLLUP_MODELS:
+            # Write first: SQLite cannot upgrade a transaction that has only
+            # read to a writer while another connection writes (e.g. a job
+            # heartbeat), and fails it with "database is locked" instead
+            model.objects.all().delete()
+            rows = _collect(model)
+            _write(model, rows, batch_size)
+            written[model.__name__] = len(rows)
+    return written
+
+
+def rebuild_rows(model, ids, batch_size=1000):
+    """Recompute one rollup table's rows for the given equipment or team IDs. Returns rows written."""
+    with transaction.atomic(using=router.db_for_write(model)):
+        model.objects.filter(**{f'{model.dimension}_id__in': ids}).delete()
+        rows = _collect(model, ids)
+        _write(model, rows, batch_size)
+    return len(rows)
+
+
+def contributions(request_ids):
+    """
+    What the given live requests add to each rollup table, as rebuild() counts them.
+
+    Returns {model: {(dimension_id, day): counters}}. Taken before and after a
+    write, the difference is what the write changed in the rollups.
+    """
+    result = {}
+    for model in ROLLUP_MODELS:
+        rows = defaultdict(_empty_row)
+        requests = (
+            MaintenanceRequest.objects.filter(id__in=request_ids)
+            .exclude(**{f'{model.dimension}__isnull': True})
+            .order_by()
+        )
+        _collect_requests(rows, requests, model.dimension)
+        result[model] = rows
+    return result
+
+
+def apply_contributions(added, removed=None):
+    """
+    Add one contributions() result to the rollup tables and subtract another.
+
+    Rows left with every counter at zero are deleted, so the tables keep
+    matching rebuild().
+    """
+    for model in ROLLUP_MODELS:
+        changes = defaultdict(_empty_row)
+        for sign, rows in ((1, added.get(model, {})), (-1, (removed or {}).get(model, {}))):
+            for key, counters in rows.items():
+                for name, value in counters.items():
+                    changes[key][name] += value * sign
+        empty = _empty_row()
+        for (dimension_id, day), counters in changes.items():
+            counters = {name: value for name, value in counters.items() if value != empty[name]}
+            if not counters:
+                continue
+            lookup = {f'{model.dimension}_id': dimension_id, 'day': day}
+            row, _ = model.objects.get_or_create(**lookup)
+            model.objects.filter(pk=row.pk).update(
+                **{name: F(name) + value for name, value in counters.items()}
+            )
+            model.objects.filter(pk=row.pk, **empty).delete()
+
+
+def _write(model, rows, batch_size):
+    model.objects.bulk_create(
+        [
+            model(**{f'{model.dimension}_id': dimension_id, 'day': day}, **counters)
+            for (dimension_id, day), counters in rows.items()
+        ],
+        batch_size=batch_size,
+    )
+
+
+def _summary(row, name=None):
+    opened = row['opened'] or 0
+    repaired = row['repaired'] or 0
+    repair_time = row['repair_time'] or timedelta()
+    return {
+        'name': name,
+        'opened': opened,
+        'failures': row['corrective'] or 0,
+        'preventive': row['preventive'] or 0,
+        'corrective_ratio': round((row['corrective'] or 0) / opened, 4) if opened else None,
+        'repaired': repaired,
+        'scrapped': row['scrapped'] or 0,
+        'mttr_hours': round(repair_time.total_seconds() / 3600 / repaired, 2) if repaired else None,
+    }
+
+
+def summarize(group_by='equipment', start=None, end=None, site=None):
+    """MTTR, failure counts and corrective ratio per group, plus overall totals."""
+    model, key, label = GROUPINGS[group_by]
+    stats = model.objects.all()
+    if site:
+        stats = stats.filter(**{f'{model.dimension}__site': site})
+    if start:
+        stats = stats.filter(day__gte=start)
+    if end:
+        stats = stats.filter(day__lte=end)
+
+    totals = dict(
+        opened=Sum('opened_count'),
+        corrective=Sum('corrective_count'),
+        preventive=Sum('preventive_count'),
+        repaired=Sum('repaired_count'),
+        scrapped=Sum('scrapped_count'),
+        repair_time=Sum('repair_time_total'),
+    )
+    fields = [key, label] if label else [key]
+    groups = stats.values(*fields).annotate(**totals).order_by(*fields)
+
+    results = []
+    for row in groups:
+        summary = _summary(row, row[label] if label else row[key])
+        summary['key'] = row[key]
+        results.append(summary)
+    return {
+        'results': results,
+        'totals': _summary(stats.aggregate(**totals), 'All'),
+    }
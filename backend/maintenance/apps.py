@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class MaintenanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'maintenance'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+        from . import routers
+
+        post_save.connect(routers.mirror_user, sender=User, dispatch_uid='mirror_user')
+        post_delete.connect(routers.unmirror_user, sender=User, dispatch_uid='unmirror_user')
@@ -0,0 +1,75 @@
+"""
+Archival of closed maintenance requests.
+
+Closed (REPAIRED/SCRAP) requests whose last update is older than the cutoff
+are copied into ArchivedMaintenanceRequest and removed from the live table,
+one transaction per batch, so the hot table only holds current work. This
+covers the current database; run it under routers.each_database() to cover
+every site database.
+
+A request is only deleted once its archive row has been inserted in the same
+transaction. Requests whose id is already in the archive are left live and
+reported as skipped rather than overwritten or lost.
+"""
+import logging
+
+from . import routers
+from .models import MaintenanceRequest, ArchivedMaintenanceRequest
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [
+    'id', 'subject', 'equipment_id', 'request_type', 'team_id', 'technician_id',
+    'scheduled_date', 'duration', 'status', 'created_by_id', 'created_at', 'updated_at',
+    'version', 'site_id', 'due_at', 'escalated_at',
+]
+
+
+def archivable_requests(cutoff):
+    """Closed requests last updated before the cutoff."""
+    return MaintenanceRequest.objects.filter(
+        status__in=MaintenanceRequest.CLOSED_STATUSES,
+        updated_at__lt=cutoff,
+    )
+
+
+def archive_closed_requests(cutoff, batch_size=500, progress=None):
+    """
+    Move archivable requests into the archive table in batches.
+
+    progress, if given, is called with the running total after each batch.
+    Returns the number of requests archived.
+    """
+    archived = 0
+    last_id = 0
+    while True:
+        with routers.atomic(MaintenanceRequest, ArchivedMaintenanceRequest):
+            ids = list(
+                archivable_requests(cutoff)
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            already_archived = set(
+                ArchivedMaintenanceRequest.objects.filter(id__in=ids).values_list('id', flat=True)
+            )
+            if already_archived:
+                logger.warning('Skipping %d requests already in the archive: %s',
+                               len(already_archived), sorted(already_archived))
+            moved = [pk for pk in ids if pk not in already_archived]
+            rows = MaintenanceRequest.objects.filter(id__in=moved).values(*ARCHIVED_FIELDS)
+            # No ignore_conflicts: a row that fails to insert must abort the batch,
+            # or the DELETE below would drop a request that was never archived
+            created = ArchivedMaintenanceRequest.objects.bulk_create(
+                [ArchivedMaintenanceRequest(**row) for row in rows]
+            )
+            # Events reference requests without an FK constraint, so this is a single DELETE
+            MaintenanceRequest.objects.filter(id__in=[row.id for row in created]).delete()
+        archived += len(created)
+        if progress:
+            progress(archived)
+    return archived
@@ -0,0 +1,147 @@
+"""
+Team and technician capacity forecast.
+
+Open requests scheduled inside the window are binned into day or week buckets
+by planned hours (their duration) and compared with capacity:
+CAPACITY_HOURS_PER_DAY for each weekday in the bucket, times the team's
+member count.
+
+Binning happens in the database. Each request's bucket index comes from a
+balanced CASE over the bucket boundaries, so a row needs about log2(buckets)
+comparisons. The query returns one summed row per (team, technician, bucket),
+which keeps the Python side independent of how many requests are scheduled.
+"""
+from collections import defaultdict
+from datetime import datetime, time as datetime_time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import MaintenanceRequest, MaintenanceTeam
+
+
+BUCKET_DAYS = {'day': 1, 'week': 7}
+
+# Owner key for requests without a team or technician
+UNASSIGNED = 0
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, datetime_time.min))
+
+
+def _bucket_index(boundaries, low, high):
+    """
+    CASE expression mapping scheduled_date to a bucket index in [low, high).
+
+    boundaries[i] is the first instant of bucket i + 1.
+    """
+    if high - low == 1:
+        return Value(low)
+    middle = (low + high) // 2
+    return Case(
+        When(scheduled_date__lt=boundaries[middle - 1], then=_bucket_index(boundaries, low, middle)),
+        default=_bucket_index(boundaries, middle, high),
+        output_field=IntegerField(),
+    )
+
+
+def _planned_hours(bucket_starts, end, site=None):
+    """Planned hours per bucket for each team and each technician."""
+    boundaries = [_start_of(day) for day in bucket_starts[1:]] + [_start_of(end)]
+    requests = MaintenanceRequest.objects.filter(
+        status__in=MaintenanceRequest.OPEN_STATUSES,
+        scheduled_date__gte=_start_of(bucket_starts[0]),
+        scheduled_date__lt=_start_of(end),
+    )
+    if site:
+        requests = requests.filter(site=site)
+    grouped = (
+        requests
+        .annotate(bucket=_bucket_index(boundaries, 0, len(bucket_starts)))
+        .values('team_id', 'technician_id', 'bucket')
+        .annotate(planned=Sum('duration'))
+        .order_by()
+    )
+
+    teams = defaultdict(lambda: [0.0] * len(bucket_starts))
+    technicians = defaultdict(lambda: [0.0] * len(bucket_starts))
+    for row in grouped:
+        hours = row['planned'] / timedelta(hours=1)
+        teams[row['team_id'] or UNASSIGNED][row['bucket']] += hours
+        technicians[row['technician_id'] or UNASSIGNED][row['bucket']] += hours
+    return teams, technicians
+
+
+def _series(planned, capacity, bucket_starts):
+    planned = [round(hours, 2) for hours in planned]
+    return {
+        'planned_hours': planned,
+        'capacity_hours': capacity,
+        'overbooked': [
+            day for day, hours, available in zip(bucket_starts, planned, capacity)
+            if hours > available
+        ],
+    }
+
+
+def forecast(start, weeks=12, bucket='week', site=None):
+    """
+    Planned against available hours per team and technician for each bucket.
+
+    With a site, only that site's requests count, and teams are the site's
+    own plus those shared by every site.
+    """
+    bucket_days = BUCKET_DAYS[bucket]
+    if bucket == 'week':
+        start -= timedelta(days=start.weekday())
+    end = start + timedelta(days=weeks * 7)
+    bucket_starts = [start + timedelta(days=offset) for offset in range(0, weeks * 7, bucket_days)]
+
+    hours_per_day = settings.CAPACITY_HOURS_PER_DAY
+    day_capacity = [
+        sum(hours_per_day for offset in range(bucket_days) if (day + timedelta(days=offset)).weekday() < 5)
+        for day in bucket_starts
+    ]
+
+    team_hours, technician_hours = _planned_hours(bucket_starts, end, site)
+    empty = [0.0] * len(bucket_starts)
+
+    team_queryset = MaintenanceTeam.objects.all()
+    if site:
+        team_queryset = team_queryset.filter(Q(site=site) | Q(site__isnull=True))
+
+    teams = []
+    for team in team_queryset.annotate(member_count=Count('members')).order_by('name'):
+        teams.append({
+            'id': team.id,
+            'name': team.name,
+            'members': team.member_count,
+            **_series(
+                team_hours.get(team.id, empty),
+                [hours * team.member_count for hours in day_capacity],
+                bucket_starts,
+            ),
+        })
+
+    technicians = []
+    technician_ids = [pk for pk in technician_hours if pk != UNASSIGNED]
+    for user in User.objects.filter(pk__in=technician_ids).order_by('username'):
+        technicians.append({
+            'id': user.id,
+            'name': user.get_full_name() or user.username,
+            **_series(technician_hours[user.id], day_capacity, bucket_starts),
+        })
+
+    return {
+        'bucket': bucket,
+        'start': start,
+        'end': end,
+        'buckets': bucket_starts,
+        'teams': teams,
+        'technicians': technicians,
+        'unassigned_team_hours': [round(hours, 2) for hours in team_hours.get(UNASSIGNED, empty)],
+        'unassigned_technician_hours': [round(hours, 2) for hours in technician_hours.get(UNASSIGNED, empty)],
+    }
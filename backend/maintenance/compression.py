@@ -0,0 +1,109 @@
+"""
+Response compression codecs.
+
+gzip is always available; brotli and zstd are used when the optional
+``brotli`` / ``zstandard`` packages are installed. Each codec exposes the
+same streaming interface: compress(), flush() and finish().
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class GzipCompressor:
+    def __init__(self, level):
+        # wbits=31 selects the gzip container rather than raw zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+# Content-Encoding token -> compressor class, in server preference order
+CODECS = {}
+if zstandard is not None:
+    CODECS['zstd'] = ZstdCompressor
+if brotli is not None:
+    CODECS['br'] = BrotliCompressor
+CODECS['gzip'] = GzipCompressor
+
+DEFAULT_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+
+def compress(encoding, data, level):
+    """Compress a complete body in one call."""
+    compressor = CODECS[encoding](level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def negotiate(accept_encoding, available=None):
+    """
+    Pick a Content-Encoding from an Accept-Encoding header.
+
+    Highest client q-value wins; ties go to the server preference order of
+    CODECS. Returns None when nothing acceptable is available.
+    """
+    available = list(available if available is not None else CODECS)
+    weights = {}
+    for item in accept_encoding.split(','):
+        token, _, params = item.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
@@ -0,0 +1,116 @@
+"""
+Set-based decommissioning of equipment.
+
+Deleting Equipment through the ORM removes its whole request history in a
+single transaction, and the collector loads child rows into memory whenever
+they have dependents or signals of their own. These helpers instead delete
+children with plain DELETE ... WHERE id IN (batch) statements, one
+transaction per batch, so memory and lock time stay bounded by the batch
+size rather than the history size.
+
+Deleted requests get DELETED events in the same transaction, as
+perform_destroy records them, so change-feed clients drop them. The daily
+rollups of the teams that worked on them are rebuilt once at the end.
+"""
+from django.db import router, transaction
+
+from . import analytics, facets, routers
+from .models import (
+    Equipment,
+    MaintenanceRequest,
+    ArchivedMaintenanceRequest,
+    RequestEvent,
+    EquipmentDailyStats,
+    TeamDailyStats,
+)
+
+
+# Models with an equipment FK, deleted before the equipment rows themselves.
+# None of them has dependents of its own (request events are unconstrained),
+# so QuerySet.delete() takes Django's fast-delete path: one DELETE, no SELECT.
+EQUIPMENT_CHILDREN = [
+    ('requests', MaintenanceRequest),
+    ('archived_requests', ArchivedMaintenanceRequest),
+    ('daily_stats', EquipmentDailyStats),
+]
+
+# Children whose rows are requests, logged as DELETED events
+REQUEST_MODELS = (MaintenanceRequest, ArchivedMaintenanceRequest)
+
+
+def _delete_in_batches(queryset, batch_size, actor=None):
+    """Delete a queryset batch by batch, returning the number of rows removed."""
+    model = queryset.model
+    logged = model in REQUEST_MODELS
+    fields = ['pk', 'status', 'technician_id', 'site__code'] if logged else ['pk']
+    deleted = 0
+    while True:
+        with routers.atomic(model, RequestEvent):
+            rows = list(queryset.order_by().values(*fields)[:batch_size])
+            if not rows:
+                return deleted
+            model.objects.filter(pk__in=[row['pk'] for row in rows]).delete()
+            if logged:
+                RequestEvent.objects.bulk_create([
+                    RequestEvent(
+                        request_id=row['pk'],
+                        event_type='DELETED',
+                        to_status=row['status'],
+                        technician_id=row['technician_id'],
+                        actor=actor,
+                        site=row['site__code'] or '',
+                    )
+                    for row in rows
+                ])
+        deleted += len(rows)
+
+
+def archive_equipment(equipment_ids, batch_size=1000, progress=None):
+    """Mark equipment unusable with one UPDATE per batch. Returns rows updated."""
+    updated = 0
+    for start in range(0, len(equipment_ids), batch_size):
+        batch = equipment_ids[start:start + batch_size]
+        with transaction.atomic(using=router.db_for_write(Equipment)):
+            updated += Equipment.objects.filter(id__in=batch).update(is_usable=False)
+            facets.invalidate(router.db_for_write(Equipment))
+        if progress:
+            progress({'equipment': updated})
+    return updated
+
+
+def delete_equipment(equipment_ids, batch_size=1000, progress=None, actor=None):
+    """
+    Delete equipment and all of its history with batched set-based DELETEs.
+
+    progress, if given, is called with the running totals after each
+    equipment batch. actor is recorded on the DELETED events. Returns the
+    final totals.
+    """
+    if actor is not None and not actor.is_authenticated:
+        actor = None
+    totals = {name: 0 for name, _ in EQUIPMENT_CHILDREN}
+    totals['equipment'] = 0
+    team_ids = set()
+    for start in range(0, len(equipment_ids), batch_size):
+        batch = equipment_ids[start:start + batch_size]
+        for model in REQUEST_MODELS:
+            team_ids.update(
+                model.objects.filter(equipment_id__in=batch, team__isnull=False)
+                .order_by().values_list('team_id', flat=True).distinct()
+            )
+        for name, model in EQUIPMENT_CHILDREN:
+            totals[name] += _delete_in_batches(
+                model.objects.filter(equipment_id__in=batch),
+                batch_size,
+                actor,
+            )
+        with transaction.atomic(using=router.db_for_write(Equipment)):
+            totals['equipment'] += Equipment.objects.filter(id__in=batch).delete()[1].get(
+                Equipment._meta.label, 0
+            )
+            facets.invalidate(router.db_for_write(Equipment))
+        if progress:
+            progress(dict(totals))
+    if team_ids:
+        totals['team_stats_rebuilt'] = analytics.rebuild_rows(TeamDailyStats, sorted(team_ids), batch_size)
+    return totals
@@ -0,0 +1,103 @@
+"""
+Faceted filtering of the equipment list.
+
+Each facet is an equipment field the list can be filtered on. Counts are
+disjunctive, as filter dropdowns expect: a facet's counts apply every other
+active filter but not its own, so the alternatives stay visible. Each facet
+is one grouped query (GROUP BY field), so the cost does not depend on page
+size, and the result is cached.
+
+Cache entries are keyed by a generation number that every equipment or team
+write bumps (see Equipment.save and invalidate()), so counts stay cached
+until equipment changes. EQUIPMENT_FACET_CACHE_SECONDS bounds staleness for
+changes made outside the ORM. Use a shared cache backend when running
+several workers, or each worker only sees its own invalidations.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+
+GENERATION_KEY = 'equipment-facets:generation'
+
+# facet name -> (equipment field, display name lookup)
+FACETS = {
+    'department_or_owner': ('department_or_owner', None),
+    'location': ('location', None),
+    'default_team': ('default_team', 'default_team__name'),
+    'is_usable': ('is_usable', None),
+}
+
+
+def _new_generation():
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def invalidate(using=None):
+    """
+    Drop every cached facet count by starting a new generation.
+
+    Deferred until the write's transaction on the given database commits, so
+    a concurrent read cannot cache counts that miss the write.
+    """
+    transaction.on_commit(_new_generation, using=using)
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def facet_filter(name, values):
+    """Q matching any of the values for one facet; None matches an empty value."""
+    field, _ = FACETS[name]
+    condition = Q(**{f'{field}__in': [value for value in values if value is not None]})
+    if None in values:
+        condition |= Q(**{f'{field}__isnull': True})
+    return condition
+
+
+def apply_filters(queryset, filters, exclude=None):
+    """Filter a queryset by every facet in filters except exclude."""
+    for name, values in filters.items():
+        if name != exclude:
+            queryset = queryset.filter(facet_filter(name, values))
+    return queryset
+
+
+def _count(queryset, filters):
+    result = {}
+    for name, (field, label) in FACETS.items():
+        fields = [field, label] if label else [field]
+        rows = (
+            apply_filters(queryset, filters, exclude=name)
+            .order_by()
+            .values(*fields)
+            .annotate(count=Count('id'))
+            .order_by(field)
+        )
+        result[name] = [
+            {'value': row[field], **({'label': row[label]} if label else {}), 'count': row['count']}
+            for row in rows
+        ]
+    return result
+
+
+def counts(queryset, filters, scope=''):
+    """
+    Per-facet value counts for the equipment matching filters.
+
+    queryset is the unfiltered equipment visible to the caller; scope must
+    identify it (e.g. the site) since it is part of the cache key.
+    """
+    raw = json.dumps([scope, sorted(filters.items())], default=str)
+    key = f'equipment-facets:{_generation()}:{hashlib.sha1(raw.encode()).hexdigest()}'
+    result = cache.get(key)
+    if result is None:
+        result = _count(queryset, filters)
+        cache.set(key, result, settings.EQUIPMENT_FACET_CACHE_SECONDS)
+    return result
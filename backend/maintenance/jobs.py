@@ -0,0 +1,217 @@
+"""
+Database-backed background job queue.
+
+Heavy operations (archival, rollup rebuilds, decommissioning) are
+enqueued as Job rows and run by `python manage.py run_worker` instead of
+inside HTTP workers. Workers claim jobs with a conditional UPDATE ... WHERE
+status = 'QUEUED', so any number of worker threads and processes can share
+the queue without a broker or row locks.
+
+Failed jobs are retried with exponential backoff up to max_attempts. Running
+jobs are kept alive by their worker's heartbeat; a job whose worker stops
+heartbeating for JOB_LEASE_TIMEOUT seconds is handed to another worker.
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from . import analytics, archive, decommission, overdue, routers
+from .models import Job
+
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register a job handler: handler(params, progress) -> JSON result."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+@handler('archive_requests')
+def archive_requests(params, progress):
+    cutoff = timezone.now() - timedelta(days=params.get('older_than_days', 365))
+    archived = 0
+    for _ in routers.each_database():
+        archived += archive.archive_closed_requests(
+            cutoff,
+            batch_size=params.get('batch_size', 500),
+            progress=lambda total: progress({'archived': archived + total}),
+        )
+    return {'archived': archived}
+
+
+@handler('rebuild_rollups')
+def rebuild_rollups(params, progress):
+    written = {}
+    for alias in routers.each_database():
+        written[alias] = analytics.rebuild(batch_size=params.get('batch_size', 1000))
+        progress(dict(written))
+    return written
+
+
+@handler('decommission_equipment')
+def decommission_equipment(params, progress):
+    ids = params['ids']
+    batch_size = params.get('batch_size', 1000)
+    # IDs were checked against this site, and may live in its own database
+    with routers.use_site_database(routers.site_database(params.get('site'))):
+        if params.get('mode') == 'delete':
+            return decommission.delete_equipment(ids, batch_size, progress)
+        return {'equipment': decommission.archive_equipment(ids, batch_size, progress)}
+
+
+@handler('escalate_overdue')
+def escalate_overdue(params, progress):
+    escalated = 0
+    for _ in routers.each_database():
+        escalated += overdue.escalate_overdue(
+            batch_size=params.get('batch_size', 500),
+            progress=lambda total: progress({'escalated': escalated + total}),
+        )
+    return {'escalated': escalated}
+
+
+def enqueue(kind, params=None, max_attempts=3):
+    """Add a job to the queue."""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(kind=kind, params=params or {}, max_attempts=max_attempts)
+
+
+def process_prefix():
+    return f'{socket.gethostname()}:{os.getpid()}:'
+
+
+def worker_name():
+    return f'{process_prefix()}{threading.current_thread().name}'
+
+
+def claim(worker):
+    """Mark the oldest runnable job as RUNNING for this worker. Returns it, or None."""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status='QUEUED', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status='QUEUED').update(
+            status='RUNNING',
+            locked_by=worker,
+            locked_at=now,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run(job):
+    """Run a claimed job and record its result, retry or failure."""
+    interval = settings.JOB_PROGRESS_INTERVAL
+    latest = {'progress': job.progress, 'written_at': 0.0}
+
+    def progress(value):
+        latest['progress'] = value
+        if time.monotonic() - latest['written_at'] >= interval:
+            Job.objects.filter(pk=job.pk).update(progress=value)
+            latest['written_at'] = time.monotonic()
+
+    try:
+        func = HANDLERS.get(job.kind)
+        if func is None:
+            raise ValueError(f'Unknown job kind: {job.kind}')
+        result = func(job.params, progress)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status='QUEUED',
+                progress=latest['progress'],
+                error=error,
+                run_after=now + timedelta(seconds=delay),
+                locked_by='',
+                locked_at=None,
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='FAILED',
+                progress=latest['progress'],
+                error=error,
+                finished_at=now,
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status='SUCCEEDED',
+        progress=latest['progress'],
+        result=result,
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def heartbeat(attempts=3):
+    """
+    Extend the lease on every job held by this process.
+
+    Retried when the database is busy (SQLite raises OperationalError while a
+    job holds the write lock). Returns 0 if every attempt failed; the lease
+    outlasts several beats, so the next one renews it.
+    """
+    for attempt in range(attempts):
+        try:
+            return Job.objects.filter(status='RUNNING', locked_by__startswith=process_prefix()).update(
+                locked_at=timezone.now()
+            )
+        except OperationalError:
+            time.sleep(0.1 * 2 ** attempt)
+    return 0
+
+
+def requeue_expired():
+    """Return jobs whose worker stopped heartbeating to the queue (or fail them when out of attempts)."""
+    expired = Job.objects.filter(
+        status='RUNNING',
+        locked_at__lt=timezone.now() - timedelta(seconds=settings.JOB_LEASE_TIMEOUT),
+    )
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED',
+        error='Worker stopped responding',
+        finished_at=timezone.now(),
+    )
+    requeued = expired.update(status='QUEUED', locked_by='', locked_at=None)
+    return requeued, failed
+
+
+def work(stop, once=False, poll_interval=None):
+    """Claim and run jobs until stop is set (or, with once, the queue is empty)."""
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    worker = worker_name()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim(worker)
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll_interval)
+                continue
+            run(job)
+    finally:
+        connection.close()
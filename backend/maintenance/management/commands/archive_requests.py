@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from maintenance import routers
+from maintenance.archive import archivable_requests, archive_closed_requests
+
+
+class Command(BaseCommand):
+    help = 'Move closed (REPAIRED/SCRAP) requests older than a cutoff into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=365,
+            help='Archive closed requests not updated for this many days (default: 365)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Requests moved per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many requests would be archived'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+
+        if options['dry_run']:
+            for alias in routers.each_database():
+                count = archivable_requests(cutoff).count()
+                self.stdout.write(f'{alias}: {count} requests closed before {cutoff:%Y-%m-%d} would be archived')
+            return
+
+        self.stdout.write(f'Archiving requests closed before {cutoff:%Y-%m-%d}...')
+        archived = 0
+        for alias in routers.each_database():
+            archived += archive_closed_requests(
+                cutoff,
+                batch_size=options['batch_size'],
+                progress=lambda total: self.stdout.write(f'  {alias}: archived {total} requests'),
+            )
+        self.stdout.write(self.style.SUCCESS(f'\n✓ {archived} requests archived'))
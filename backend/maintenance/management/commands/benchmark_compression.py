@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from maintenance import compression
+
+
+DEFAULT_PATHS = ['/api/requests/', '/api/equipment/?health=true', '/api/calendar/', '/api/events/?since=0&limit=500']
+
+# Levels tried per codec: fast, the configured default, and high
+BENCHMARK_LEVELS = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 11],
+    'zstd': [1, 3, 19],
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure compressed size against CPU time for API responses with each available codec'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            default=DEFAULT_PATHS,
+            help='API paths to fetch (default: requests, equipment, calendar and events)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Compressions per codec/level; the mean is reported (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        repeat = max(options['repeat'], 1)
+
+        self.stdout.write(f'Codecs available: {", ".join(compression.CODECS)}')
+        for path in options['paths']:
+            response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'\n{path}: HTTP {response.status_code}, skipped'))
+                continue
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+
+            self.stdout.write(f'\n{path} ({len(body)} bytes)')
+            self.stdout.write(f'  {"codec":<6}{"level":>6}{"bytes":>10}{"ratio":>8}{"ms":>9}{"MB/s":>9}')
+            for encoding in compression.CODECS:
+                for level in BENCHMARK_LEVELS[encoding]:
+                    start = time.perf_counter()
+                    for _ in range(repeat):
+                        compressed = compression.compress(encoding, body, level)
+                    elapsed = (time.perf_counter() - start) / repeat
+                    ratio = len(compressed) / len(body) if body else 1
+                    throughput = len(body) / elapsed / 1e6 if elapsed else 0
+                    self.stdout.write(
+                        f'  {encoding:<6}{level:>6}{len(compressed):>10}{ratio:>8.3f}'
+                        f'{elapsed * 1000:>9.3f}{throughput:>9.1f}'
+                    )
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Benchmark complete'))
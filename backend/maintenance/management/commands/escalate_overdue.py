@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from maintenance import routers
+from maintenance.overdue import escalate_overdue, overdue_requests
+
+
+class Command(BaseCommand):
+    help = 'Escalate open requests that are past their scheduled date + duration'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Requests escalated per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--every',
+            type=int,
+            default=None,
+            help='Keep running and sweep every this many seconds instead of once'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many requests are overdue'
+        )
+
+    def escalate(self, batch_size):
+        """Escalate overdue requests in every database. Returns the number escalated."""
+        return sum(escalate_overdue(batch_size=batch_size) for _ in routers.each_database())
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for alias in routers.each_database():
+                overdue = overdue_requests()
+                pending = overdue.filter(escalated_at__isnull=True).count()
+                self.stdout.write(f'{alias}: {overdue.count()} requests overdue, {pending} not yet escalated')
+            return
+
+        if options['every'] is None:
+            escalated = self.escalate(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'\n✓ {escalated} requests escalated'))
+            return
+
+        self.stdout.write(f'Sweeping for overdue requests every {options["every"]}s...')
+        try:
+            while True:
+                close_old_connections()
+                escalated = self.escalate(options['batch_size'])
+                if escalated:
+                    self.stdout.write(f'  Escalated {escalated} requests')
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('\n✓ Sweeper stopped'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from maintenance import analytics, routers
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily equipment/team analytics rollups from request history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows inserted per INSERT statement (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding analytics rollups...')
+
+        for alias in routers.each_database():
+            written = analytics.rebuild(batch_size=options['batch_size'])
+            for model_name, count in written.items():
+                self.stdout.write(f'  {alias}: {model_name}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('\n✓ Rollups rebuilt successfully!'))
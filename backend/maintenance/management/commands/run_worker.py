@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+from maintenance import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Number of worker threads or processes (default: 2)'
+        )
+        parser.add_argument(
+            '--pool',
+            choices=['thread', 'process'],
+            default='thread',
+            help='Run jobs in threads of this process or in separate worker processes (default: thread)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling for new jobs'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds between polls of an empty queue (default: JOB_POLL_INTERVAL)'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        if options['pool'] == 'process':
+            return self.run_processes(concurrency, options)
+
+        self.stdout.write(f'Starting {concurrency} worker thread(s)...')
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=jobs.work,
+                args=(stop, options['once'], options['poll_interval']),
+                name=f'worker-{index}',
+            )
+            for index in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Keep leases of running jobs alive and recover jobs from dead workers
+        interval = settings.JOB_LEASE_TIMEOUT / 3
+        try:
+            while any(thread.is_alive() for thread in threads):
+                close_old_connections()
+                jobs.heartbeat()
+                try:
+                    requeued, failed = jobs.requeue_expired()
+                except OperationalError:
+                    # Database busy with a running job; try again next interval
+                    requeued = failed = 0
+                if requeued or failed:
+                    self.stdout.write(f'  Recovered {requeued} stalled job(s), failed {failed}')
+                for thread in threads:
+                    thread.join(timeout=interval / len(threads))
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after the current jobs finish...')
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Worker stopped'))
+
+    def run_processes(self, concurrency, options):
+        """Start one single-threaded worker process per slot and wait for them."""
+        self.stdout.write(f'Starting {concurrency} worker process(es)...')
+        command = [sys.executable, sys.argv[0], 'run_worker', '--pool', 'thread', '--concurrency', '1']
+        if options['once']:
+            command.append('--once')
+        if options['poll_interval'] is not None:
+            command += ['--poll-interval', str(options['poll_interval'])]
+
+        processes = [subprocess.Popen(command) for _ in range(concurrency)]
+        try:
+            for process in processes:
+                process.wait()
+        except KeyboardInterrupt:
+            # Children receive the same interrupt from the terminal and stop on their own
+            for process in processes:
+                process.wait()
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Workers stopped'))
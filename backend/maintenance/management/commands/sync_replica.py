@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database into the replica alias, for testing read routing locally'
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE
+        if not alias:
+            raise CommandError('REPLICA_DATABASE is not set.')
+
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite files; use database replication for other backends.')
+
+        self.stdout.write(f'Copying {source.settings_dict["NAME"]} to {target.settings_dict["NAME"]}...')
+        source.ensure_connection()
+        target.ensure_connection()
+        source.connection.backup(target.connection)
+        self.stdout.write(self.style.SUCCESS(f'\n✓ Replica "{alias}" is up to date'))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from maintenance.routers import user_fields
+
+
+class Command(BaseCommand):
+    help = 'Copy every user from default into each site database, which site rows reference'
+
+    def handle(self, *args, **options):
+        aliases = sorted(set(settings.SITE_DATABASES.values()))
+        if not aliases:
+            raise CommandError('SITE_DATABASES is empty.')
+
+        users = list(User.objects.all())
+        for alias in aliases:
+            self.stdout.write(f'Mirroring {len(users)} users into "{alias}"...')
+            with transaction.atomic(using=alias):
+                for user in users:
+                    User.objects.using(alias).update_or_create(pk=user.pk, defaults=user_fields(user))
+                User.objects.using(alias).exclude(pk__in=[user.pk for user in users]).delete()
+        self.stdout.write(self.style.SUCCESS(f'\n✓ Users mirrored into {len(aliases)} site databases'))
@@ -0,0 +1,96 @@
+"""
+Response compression negotiated from the client's Accept-Encoding.
+
+Replaces django.middleware.gzip.GZipMiddleware: picks zstd, br or gzip
+(whichever the client prefers and is installed), skips bodies under
+COMPRESSION_MIN_SIZE, and compresses streaming responses chunk by chunk,
+flushing after each chunk so event streams are not held back. Only JSON and
+event-stream responses are compressed; HTML is sent as is.
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from . import compression
+
+
+# API payloads only. HTML pages (admin, browsable API) embed CSRF tokens next
+# to reflected input, and compressing them would open them to BREACH
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'text/event-stream',
+)
+SUFFIXED_TYPES = ('+json',)
+
+re_strong_etag = _lazy_re_compile(r'^"')
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type in COMPRESSIBLE_TYPES or media_type.endswith(SUFFIXED_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.levels = {**compression.DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        if not is_compressible(response.get('Content-Type', '')):
+            return response
+
+        # Every compressible response varies on Accept-Encoding, compressed or not
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(encoding, level, response.streaming_content)
+            else:
+                response.streaming_content = self._compress_sync(encoding, level, response.streaming_content)
+            del response['Content-Length']
+        else:
+            body = compression.compress(encoding, response.content, level)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response['Content-Length'] = str(len(body))
+
+        # The compressed body is no longer byte-identical to the entity the
+        # strong ETag described (RFC 9110 8.8.1)
+        if response.has_header('ETag'):
+            response['ETag'] = re_strong_etag.sub('W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _compress_sync(encoding, level, chunks):
+        compressor = compression.CODECS[encoding](level)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def _compress_async(encoding, level, chunks):
+        compressor = compression.CODECS[encoding](level)
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
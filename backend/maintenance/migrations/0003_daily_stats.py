@@ -0,0 +1,66 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:10
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0002_requestevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('opened_count', models.PositiveIntegerField(default=0)),
+                ('corrective_count', models.PositiveIntegerField(default=0)),
+                ('preventive_count', models.PositiveIntegerField(default=0)),
+                ('repaired_count', models.PositiveIntegerField(default=0)),
+                ('scrapped_count', models.PositiveIntegerField(default=0)),
+                ('repair_time_total', models.DurationField(default=datetime.timedelta, help_text='Sum of created-to-repaired time for requests repaired that day')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='maintenance.maintenanceteam')),
+            ],
+            options={
+                'verbose_name_plural': 'Team daily stats',
+                'ordering': ['day'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='EquipmentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('opened_count', models.PositiveIntegerField(default=0)),
+                ('corrective_count', models.PositiveIntegerField(default=0)),
+                ('preventive_count', models.PositiveIntegerField(default=0)),
+                ('repaired_count', models.PositiveIntegerField(default=0)),
+                ('scrapped_count', models.PositiveIntegerField(default=0)),
+                ('repair_time_total', models.DurationField(default=datetime.timedelta, help_text='Sum of created-to-repaired time for requests repaired that day')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='maintenance.equipment')),
+            ],
+            options={
+                'verbose_name_plural': 'Equipment daily stats',
+                'ordering': ['day'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['day'], name='equipment_daily_stats_day')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='equipmentdailystats',
+            constraint=models.UniqueConstraint(fields=('equipment', 'day'), name='equipment_daily_stats_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='teamdailystats',
+            index=models.Index(fields=['day'], name='team_daily_stats_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='teamdailystats',
+            constraint=models.UniqueConstraint(fields=('team', 'day'), name='team_daily_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0004_request_equipment_status_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['technician', 'status'], name='request_tech_status'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0007_archivedmaintenancerequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['-created_at', '-id'], name='request_created'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['scheduled_date'], name='request_scheduled'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['request_type', 'scheduled_date'], name='request_type_scheduled'),
+        ),
+        migrations.AddIndex(
+            model_name='requestevent',
+            index=models.Index(fields=['event_type', 'id'], name='event_type_id'),
+        ),
+    ]
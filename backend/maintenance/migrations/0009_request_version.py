@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0008_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedmaintenancerequest',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Incremented on every write; exposed as the ETag for If-Match updates'),
+        ),
+    ]
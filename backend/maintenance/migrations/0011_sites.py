@@ -0,0 +1,64 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0010_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Site',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(help_text='Short identifier sent as X-Site or ?site=', unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedmaintenancerequest',
+            name='site',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_requests', to='maintenance.site'),
+        ),
+        migrations.AddField(
+            model_name='equipment',
+            name='site',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='equipment', to='maintenance.site'),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='site',
+            field=models.ForeignKey(blank=True, help_text='Copied from the equipment so site-scoped queries need no join', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='maintenance_requests', to='maintenance.site'),
+        ),
+        migrations.AddField(
+            model_name='maintenanceteam',
+            name='site',
+            field=models.ForeignKey(blank=True, help_text='Leave empty for teams shared by every site', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='teams', to='maintenance.site'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['site', '-created_at'], name='equipment_site_created'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['site', 'status', '-created_at', '-id'], name='request_site_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['site', '-created_at', '-id'], name='request_site_created'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['site', 'scheduled_date'], name='request_site_scheduled'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DateTimeField, ExpressionWrapper, F
+
+
+def backfill_due_at(apps, schema_editor):
+    due_at = ExpressionWrapper(F('scheduled_date') + F('duration'), output_field=DateTimeField())
+    for name in ('MaintenanceRequest', 'ArchivedMaintenanceRequest'):
+        model = apps.get_model('maintenance', name)
+        model.objects.using(schema_editor.connection.alias).update(due_at=due_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0011_sites'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedmaintenancerequest',
+            name='due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedmaintenancerequest',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='due_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='scheduled_date + duration, stored so overdue scans can use an index', null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the overdue sweeper escalated the request; cleared on reschedule', null=True),
+        ),
+        migrations.RunPython(backfill_due_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='requestevent',
+            name='event_type',
+            field=models.CharField(choices=[('CREATED', 'Created'), ('STATUS_CHANGED', 'Status Changed'), ('ASSIGNED', 'Assigned'), ('DELETED', 'Deleted'), ('ESCALATED', 'Escalated')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'due_at'], name='request_status_due'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'escalated_at', 'due_at'], name='request_status_escalated_due'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-19 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0012_overdue_escalation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileTarget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(blank=True, help_text='Leave empty for any method', max_length=10)),
+                ('path', models.CharField(help_text='Path prefix, e.g. /api/requests/', max_length=500)),
+                ('query_contains', models.CharField(blank=True, help_text='Only requests whose query string contains this, e.g. status=NEW', max_length=500)),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile (every call)'), ('sample', 'Sampling (stack snapshots)')], default='cprofile', max_length=20)),
+                ('remaining', models.PositiveIntegerField(default=1, help_text='Requests left to profile')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('query_string', models.TextField(blank=True)),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile (every call)'), ('sample', 'Sampling (stack snapshots)')], max_length=20)),
+                ('status_code', models.PositiveIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('sql_count', models.PositiveIntegerField()),
+                ('sql_time_ms', models.FloatField()),
+                ('queries', models.JSONField(default=list, help_text='Slowest statements first: sql, ms, database')),
+                ('stats', models.BinaryField(help_text='cProfile data in pstats format (marshalled Stats.stats)', null=True)),
+                ('folded', models.TextField(blank=True, help_text='Sampled stacks in folded format')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0013_request_profiling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestevent',
+            name='site',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
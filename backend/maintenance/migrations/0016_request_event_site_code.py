@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-19 04:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_event_site(apps, schema_editor):
+    # Events used to leave site empty for requests stored on default; fill in
+    # the site of those requests that still exist there, live or archived
+    alias = schema_editor.connection.alias
+    RequestEvent = apps.get_model('maintenance', 'RequestEvent')
+    for name in ('MaintenanceRequest', 'ArchivedMaintenanceRequest'):
+        model = apps.get_model('maintenance', name)
+        site_code = model.objects.using(alias).filter(pk=OuterRef('request_id')).values('site__code')[:1]
+        RequestEvent.objects.using(alias).filter(
+            site='',
+            request_id__in=model.objects.using(alias).filter(site__isnull=False).values('pk'),
+        ).update(site=Subquery(site_code))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0015_equipment_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requestevent',
+            index=models.Index(fields=['site', 'id'], name='event_site_id'),
+        ),
+        migrations.RunPython(backfill_event_site, migrations.RunPython.noop),
+    ]
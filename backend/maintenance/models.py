@@ -1,11 +1,38 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import timedelta
+
+from . import facets, routers
+
+
+class Site(models.Model):
+    """Plant or facility that owns equipment, teams and requests."""
+    code = models.SlugField(max_length=50, unique=True, help_text="Short identifier sent as X-Site or ?site=")
+    name = models.CharField(max_length=200)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
 
 
 class MaintenanceTeam(models.Model):
     """Maintenance team with assigned technicians."""
     name = models.CharField(max_length=200, unique=True)
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='teams',
+        help_text="Leave empty for teams shared by every site"
+    )
     members = models.ManyToManyField(User, related_name='maintenance_teams', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -16,11 +43,79 @@ class MaintenanceTeam(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Team names label the default_team equipment facet
+        facets.invalidate(self._state.db)
+
+    def delete(self, *args, **kwargs):
+        facets.invalidate(self._state.db)
+        return super().delete(*args, **kwargs)
+
+
+class EquipmentQuerySet(models.QuerySet):
+    """Query helpers for Equipment."""
+
+    def with_health(self):
+        """
+        Annotate open_request_count, last_repaired_at and next_scheduled_at.
+
+        Each value is a correlated subquery served by the
+        (equipment, status, scheduled_date) index on MaintenanceRequest,
+        so the whole page stays a single query. last_repaired_at is when a
+        request last moved to REPAIRED, from the event log. Requests without
+        that event fall back to updated_at: ones repaired before the log
+        existed, or site databases, whose events live on default.
+        """
+        requests = MaintenanceRequest.objects.filter(equipment=OuterRef('pk')).order_by()
+        open_requests = requests.filter(status__in=MaintenanceRequest.OPEN_STATUSES)
+        repaired_at = Coalesce(
+            Subquery(
+                RequestEvent.objects.filter(
+                    routers.database_events(self.db),
+                    request=OuterRef('pk'),
+                    event_type='STATUS_CHANGED',
+                    to_status='REPAIRED',
+                )
+                .order_by('-id')
+                .values('created_at')[:1]
+            ),
+            'updated_at'
+        )
+        return self.annotate(
+            open_request_count=Coalesce(
+                Subquery(
+                    open_requests.values('equipment')
+                    .annotate(count=Count('id'))
+                    .values('count')
+                ),
+                0
+            ),
+            last_repaired_at=Subquery(
+                requests.filter(status='REPAIRED')
+                .annotate(repaired_at=repaired_at)
+                .order_by('-repaired_at')
+                .values('repaired_at')[:1]
+            ),
+            next_scheduled_at=Subquery(
+                open_requests.filter(scheduled_date__gte=timezone.now())
+                .order_by('scheduled_date')
+                .values('scheduled_date')[:1]
+            ),
+        )
+
 
 class Equipment(models.Model):
     """Company equipment that requires maintenance."""
     name = models.CharField(max_length=200)
     serial_number = models.CharField(max_length=100, unique=True)
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='equipment'
+    )
     department_or_owner = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
     purchase_date = models.DateField()
@@ -43,13 +138,30 @@ class Equipment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EquipmentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Equipment'
+        indexes = [
+            models.Index(fields=['site', '-created_at'], name='equipment_site_created'),
+            # Admin changelist: its default ordering and its is_usable/purchase_date filters
+            models.Index(fields=['-created_at', '-id'], name='equipment_created'),
+            models.Index(fields=['is_usable', '-created_at', '-id'], name='equipment_usable_created'),
+            models.Index(fields=['purchase_date'], name='equipment_purchase_date'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.serial_number})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        facets.invalidate(self._state.db)
+
+    def delete(self, *args, **kwargs):
+        facets.invalidate(self._state.db)
+        return super().delete(*args, **kwargs)
+
 
 class MaintenanceRequest(models.Model):
     """Maintenance request for equipment."""
@@ -65,6 +177,9 @@ class MaintenanceRequest(models.Model):
         ('REPAIRED', 'Repaired'),
         ('SCRAP', 'Scrap'),
     ]
+
+    OPEN_STATUSES = ['NEW', 'IN_PROGRESS']
+    CLOSED_STATUSES = ['REPAIRED', 'SCRAP']
     
     subject = models.CharField(max_length=300)
     equipment = models.ForeignKey(
@@ -106,9 +221,50 @@ class MaintenanceRequest(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(
+        default=1,
+        help_text="Incremented on every write; exposed as the ETag for If-Match updates"
+    )
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='maintenance_requests',
+        help_text="Copied from the equipment so site-scoped queries need no join"
+    )
+    due_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="scheduled_date + duration, stored so overdue scans can use an index"
+    )
+    escalated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the overdue sweeper escalated the request; cleared on reschedule"
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['equipment', 'status', 'scheduled_date'],
+                name='request_equip_status_sched'
+            ),
+            models.Index(fields=['technician', 'status'], name='request_tech_status'),
+            models.Index(fields=['status', '-created_at', '-id'], name='request_status_created'),
+            models.Index(fields=['-created_at', '-id'], name='request_created'),
+            models.Index(fields=['scheduled_date'], name='request_scheduled'),
+            models.Index(fields=['request_type', 'scheduled_date'], name='request_type_scheduled'),
+            models.Index(fields=['site', 'status', '-created_at', '-id'], name='request_site_status_created'),
+            models.Index(fields=['site', '-created_at', '-id'], name='request_site_created'),
+            models.Index(fields=['site', 'scheduled_date'], name='request_site_scheduled'),
+            # Overdue list and sweep: status IN (open) AND [escalated_at IS NULL AND] due_at < now
+            models.Index(fields=['status', 'due_at'], name='request_status_due'),
+            models.Index(fields=['status', 'escalated_at', 'due_at'], name='request_status_escalated_due'),
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.equipment.name}"
@@ -122,15 +278,417 @@ class MaintenanceRequest(models.Model):
                     'technician': f'Technician must be a member of team {self.team.name}'
                 })
 
-    def save(self, *args, **kwargs):
-        """Auto-assign team from equipment and handle status transitions."""
-        # Auto-assign team from equipment if not set
+    def assign_default_team(self):
+        """Auto-assign team from equipment if not set. Returns True if the team changed."""
         if not self.team and self.equipment and self.equipment.default_team:
             self.team = self.equipment.default_team
+            return True
+        return False
+
+    def assign_site(self):
+        """Copy the equipment's site. Returns True if the site changed."""
+        if self.equipment and self.site_id != self.equipment.site_id:
+            self.site_id = self.equipment.site_id
+            return True
+        return False
+
+    def assign_due_at(self):
+        """Recompute due_at from the schedule. Returns True if it changed."""
+        due_at = self.scheduled_date + self.duration if self.scheduled_date and self.duration is not None else None
+        if due_at != self.due_at:
+            self.due_at = due_at
+            return True
+        return False
+
+    def save(self, *args, **kwargs):
+        """Auto-assign team, site and due time and handle status transitions."""
+        # Auto-assign team from equipment if not set
+        self.assign_default_team()
+        self.assign_site()
+        if self.assign_due_at():
+            self.escalated_at = None
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'due_at', 'escalated_at'}
         
         # If status is SCRAP, mark equipment as unusable
         if self.status == 'SCRAP' and self.equipment:
             self.equipment.is_usable = False
             self.equipment.save(update_fields=['is_usable'])
+
+        # Every write to an existing row invalidates outstanding ETags
+        if self.pk and not kwargs.get('force_insert'):
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'version', 'updated_at'}
         
         super().save(*args, **kwargs)
+
+    def save_changes(self, fields, expected_version):
+        """
+        Write only the given fields if the row is still at expected_version.
+
+        Issues a single UPDATE ... WHERE id = %s AND version = %s without
+        taking row locks. Returns False, writing nothing, when another
+        writer has changed the row since it was read.
+        """
+        self.updated_at = timezone.now()
+        if ('scheduled_date' in fields or 'duration' in fields) and self.assign_due_at():
+            # A rescheduled request gets a fresh deadline and can be escalated again
+            self.escalated_at = None
+            fields = [*fields, 'due_at', 'escalated_at']
+        values = {
+            self._meta.get_field(name).attname: getattr(self, self._meta.get_field(name).attname)
+            for name in fields
+        }
+        updated = MaintenanceRequest.objects.filter(pk=self.pk, version=expected_version).update(
+            **values,
+            updated_at=self.updated_at,
+            version=F('version') + 1,
+        )
+        if not updated:
+            return False
+        self.version = expected_version + 1
+
+        # If status moved to SCRAP, mark equipment as unusable
+        if 'status' in fields and self.status == 'SCRAP':
+            Equipment.objects.filter(pk=self.equipment_id).update(is_usable=False)
+            facets.invalidate(self._state.db)
+        return True
+
+
+class ArchivedMaintenanceRequest(models.Model):
+    """
+    Closed maintenance request moved out of the live table.
+
+    Fields mirror MaintenanceRequest in the same order (so the two tables can
+    be UNIONed) and keep the original primary key and timestamps.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    subject = models.CharField(max_length=300)
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='archived_requests'
+    )
+    request_type = models.CharField(
+        max_length=20,
+        choices=MaintenanceRequest.REQUEST_TYPE_CHOICES
+    )
+    team = models.ForeignKey(
+        MaintenanceTeam,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_requests'
+    )
+    technician = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    scheduled_date = models.DateTimeField()
+    duration = models.DurationField()
+    status = models.CharField(max_length=20, choices=MaintenanceRequest.STATUS_CHOICES)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='archived_requests'
+    )
+    due_at = models.DateTimeField(null=True, blank=True)
+    escalated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['equipment', 'status', 'scheduled_date'],
+                name='archived_equip_status_sched'
+            ),
+            models.Index(fields=['-created_at', '-id'], name='archived_created'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} (archived)"
+
+
+class RequestEvent(models.Model):
+    """Append-only log of changes made to maintenance requests."""
+
+    EVENT_TYPE_CHOICES = [
+        ('CREATED', 'Created'),
+        ('STATUS_CHANGED', 'Status Changed'),
+        ('ASSIGNED', 'Assigned'),
+        ('DELETED', 'Deleted'),
+        ('ESCALATED', 'Escalated'),
+    ]
+
+    # No FK constraint so the log survives deletion of the request it describes
+    request = models.ForeignKey(
+        MaintenanceRequest,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='events'
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    from_status = models.CharField(
+        max_length=20,
+        choices=MaintenanceRequest.STATUS_CHOICES,
+        blank=True
+    )
+    to_status = models.CharField(
+        max_length=20,
+        choices=MaintenanceRequest.STATUS_CHOICES,
+        blank=True
+    )
+    technician = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    # Code of the request's site ('' for none), for scoping the feed by site and
+    # for telling apart requests of different site databases, whose IDs may clash
+    site = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['event_type', 'id'], name='event_type_id'),
+            models.Index(fields=['site', 'id'], name='event_site_id'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} request={self.request_id}"
+
+    @classmethod
+    def record(cls, maintenance_request, event_type, from_status='', actor=None):
+        """Append an event describing the current state of a request."""
+        if actor is not None and not actor.is_authenticated:
+            actor = None
+        event = cls.objects.create(
+            request_id=maintenance_request.pk,
+            event_type=event_type,
+            from_status=from_status,
+            to_status=maintenance_request.status,
+            technician_id=maintenance_request.technician_id,
+            actor=actor,
+            site=maintenance_request.site.code if maintenance_request.site_id else '',
+        )
+        EquipmentDailyStats.apply_event(event, maintenance_request)
+        TeamDailyStats.apply_event(event, maintenance_request)
+        return event
+
+
+class DailyStats(models.Model):
+    """Daily maintenance counters, updated incrementally from request events."""
+    day = models.DateField()
+    opened_count = models.PositiveIntegerField(default=0)
+    corrective_count = models.PositiveIntegerField(default=0)
+    preventive_count = models.PositiveIntegerField(default=0)
+    repaired_count = models.PositiveIntegerField(default=0)
+    scrapped_count = models.PositiveIntegerField(default=0)
+    repair_time_total = models.DurationField(
+        default=timedelta,
+        help_text="Sum of created-to-repaired time for requests repaired that day"
+    )
+
+    # Name of the MaintenanceRequest FK this rollup is keyed on
+    dimension = None
+
+    class Meta:
+        abstract = True
+        ordering = ['day']
+
+    @classmethod
+    def event_increments(cls, event, maintenance_request):
+        """Return (day, field increments) for an event, or None if it is not counted."""
+        if event.event_type == 'CREATED':
+            type_field = (
+                'preventive_count'
+                if maintenance_request.request_type == 'PREVENTIVE'
+                else 'corrective_count'
+            )
+            return timezone.localdate(maintenance_request.created_at), {
+                'opened_count': 1,
+                type_field: 1,
+            }
+        if event.event_type == 'STATUS_CHANGED' and event.to_status == 'REPAIRED':
+            return timezone.localdate(event.created_at), {
+                'repaired_count': 1,
+                'repair_time_total': event.created_at - maintenance_request.created_at,
+            }
+        if event.event_type == 'STATUS_CHANGED' and event.to_status == 'SCRAP':
+            return timezone.localdate(event.created_at), {'scrapped_count': 1}
+        return None
+
+    @classmethod
+    def apply_event(cls, event, maintenance_request):
+        """Add an event's contribution to the row for its day."""
+        dimension_id = getattr(maintenance_request, f'{cls.dimension}_id')
+        increments = cls.event_increments(event, maintenance_request)
+        if dimension_id is None or increments is None:
+            return
+        day, fields = increments
+        row, _ = cls.objects.get_or_create(**{f'{cls.dimension}_id': dimension_id, 'day': day})
+        cls.objects.filter(pk=row.pk).update(
+            **{name: F(name) + value for name, value in fields.items()}
+        )
+
+
+class EquipmentDailyStats(DailyStats):
+    """Daily maintenance counters per equipment."""
+    dimension = 'equipment'
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+
+    class Meta(DailyStats.Meta):
+        verbose_name_plural = 'Equipment daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'day'], name='equipment_daily_stats_unique'),
+        ]
+        indexes = [models.Index(fields=['day'], name='equipment_daily_stats_day')]
+
+
+class TeamDailyStats(DailyStats):
+    """Daily maintenance counters per maintenance team."""
+    dimension = 'team'
+    team = models.ForeignKey(
+        MaintenanceTeam,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+
+    class Meta(DailyStats.Meta):
+        verbose_name_plural = 'Team daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'day'], name='team_daily_stats_unique'),
+        ]
+        indexes = [models.Index(fields=['day'], name='team_daily_stats_day')]
+
+
+class Job(models.Model):
+    """
+    Background job in the database-backed queue.
+
+    Enqueued by API actions and run by `manage.py run_worker`; the handlers
+    live in maintenance.jobs.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    progress = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Workers claim the oldest runnable job: status = QUEUED ORDER BY run_after, id
+            models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ProfileTarget(models.Model):
+    """
+    Armed request profile, set up in the admin.
+
+    The next `remaining` requests matching method, path prefix and query
+    substring are profiled (see maintenance.profiling) and then it disarms.
+    """
+    MODE_CHOICES = [
+        ('cprofile', 'cProfile (every call)'),
+        ('sample', 'Sampling (stack snapshots)'),
+    ]
+
+    method = models.CharField(max_length=10, blank=True, help_text="Leave empty for any method")
+    path = models.CharField(max_length=500, help_text="Path prefix, e.g. /api/requests/")
+    query_contains = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Only requests whose query string contains this, e.g. status=NEW"
+    )
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='cprofile')
+    remaining = models.PositiveIntegerField(default=1, help_text="Requests left to profile")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method or '*'} {self.path}?{self.query_contains} ({self.remaining} left)"
+
+    def matches(self, request):
+        return (
+            (not self.method or self.method.upper() == request.method)
+            and request.path.startswith(self.path)
+            and self.query_contains in request.META.get('QUERY_STRING', '')
+        )
+
+
+class RequestProfile(models.Model):
+    """Profile of one sampled API request, with the SQL it ran."""
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    query_string = models.TextField(blank=True)
+    mode = models.CharField(max_length=20, choices=ProfileTarget.MODE_CHOICES)
+    status_code = models.PositiveIntegerField()
+    duration_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    sql_time_ms = models.FloatField()
+    queries = models.JSONField(default=list, help_text="Slowest statements first: sql, ms, database")
+    stats = models.BinaryField(
+        null=True,
+        help_text="cProfile data in pstats format (marshalled Stats.stats)"
+    )
+    folded = models.TextField(blank=True, help_text="Sampled stacks in folded format")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.method} {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,188 @@
+"""
+On-demand profiling of live API requests.
+
+Off unless PROFILING_ENABLED. When it is off, the middleware removes itself
+from the stack at startup, so requests pay nothing. When enabled, a request
+under PROFILING_PATHS is profiled if:
+
+- it sends X-Profile: <PROFILING_TOKEN> (any X-Profile value works from a
+  staff session), or
+- it matches a ProfileTarget armed in the admin. Each worker re-reads the
+  armed targets at most every PROFILING_REFRESH_SECONDS. A sample is claimed
+  with a conditional UPDATE, so all workers together take exactly
+  `remaining` samples.
+
+The request runs under cProfile, or under a sampling profiler that snapshots
+the request thread's stack every PROFILING_SAMPLE_INTERVAL seconds
+(X-Profile-Mode: sample, or the target's mode). Every SQL statement is timed
+through connection.execute_wrapper. The result is stored as a
+RequestProfile, and its id is returned in X-Profile-Id. Download it from
+/api/profiles/{id}/download/:
+
+- cProfile runs as a .prof file, for snakeviz, flameprof or python -m pstats;
+- sampled runs as folded stacks, for flamegraph.pl or speedscope.
+
+Each process profiles one request at a time, because Python 3.12+ allows
+only one cProfile session per process. Other requests run unprofiled.
+"""
+import cProfile
+import hmac
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.models import F
+
+from .models import ProfileTarget, RequestProfile
+
+
+MODES = dict(ProfileTarget.MODE_CHOICES)
+
+_lock = threading.Lock()
+
+
+class SQLTimer:
+    """execute_wrapper that records each statement's wall time."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'database': context['connection'].alias,
+            })
+
+
+class StackSampler:
+    """Count one thread's stacks, snapshotted from a helper thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='profile-sampler', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        """Stacks in folded format: 'outer;inner count' per line."""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = tuple(settings.PROFILING_PATHS)
+        self.token = settings.PROFILING_TOKEN
+        self.refresh_seconds = settings.PROFILING_REFRESH_SECONDS
+        self.targets = []
+        self.targets_loaded_at = float('-inf')
+
+    def __call__(self, request):
+        mode = self.requested_mode(request) if request.path.startswith(self.paths) else None
+        if mode is None or not _lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request, mode)
+        finally:
+            _lock.release()
+
+    def requested_mode(self, request):
+        """Profiler mode for this request, or None to run it normally."""
+        header = request.headers.get('X-Profile')
+        if header is not None and self.header_allowed(request, header):
+            mode = request.headers.get('X-Profile-Mode', 'cprofile')
+            return mode if mode in MODES else 'cprofile'
+        return self.claim_target(request)
+
+    def header_allowed(self, request, header):
+        if self.token and hmac.compare_digest(header.encode(), self.token.encode()):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+    def claim_target(self, request):
+        """Take one sample from a matching armed target, if any is left."""
+        now = time.monotonic()
+        if now - self.targets_loaded_at >= self.refresh_seconds:
+            self.targets = list(ProfileTarget.objects.filter(remaining__gt=0))
+            self.targets_loaded_at = now
+        for target in self.targets:
+            if not target.matches(request):
+                continue
+            if ProfileTarget.objects.filter(pk=target.pk, remaining__gt=0).update(remaining=F('remaining') - 1):
+                return target.mode
+            # Used up by another worker
+            self.targets = [t for t in self.targets if t.pk != target.pk]
+        return None
+
+    def profile(self, request, mode):
+        timer = SQLTimer()
+        profiler = sampler = None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            if mode == 'sample':
+                sampler = stack.enter_context(
+                    StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+                )
+                response = self.get_response(request)
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        queries = sorted(timer.queries, key=lambda query: query['ms'], reverse=True)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.path[:500],
+            query_string=request.META.get('QUERY_STRING', ''),
+            mode=mode,
+            status_code=response.status_code,
+            duration_ms=round(duration_ms, 3),
+            sql_count=len(queries),
+            sql_time_ms=round(sum(query['ms'] for query in queries), 3),
+            queries=queries[:settings.PROFILING_MAX_QUERIES],
+            stats=marshal.dumps(pstats.Stats(profiler).stats) if profiler else None,
+            folded=sampler.folded() if sampler else '',
+        )
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
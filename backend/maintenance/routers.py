@@ -0,0 +1,182 @@
+"""
+Database routing: read replica and per-site databases.
+
+ReplicaRoutingMiddleware marks safe requests to REPLICA_ROUTED_PATHS, and
+DatabaseRouter sends the ORM reads they make to the REPLICA_DATABASE alias.
+Every write, and every read outside those requests (admin, management
+commands, job workers), stays on default.
+
+After a client writes, its reads stay on default for REPLICA_STICKY_SECONDS
+so it sees its own changes despite replication lag. Clients are identified
+the same way as for throttling and pinned in the cache, so use a shared
+cache backend when running several workers.
+
+When SITE_DATABASES maps a site code to an alias, API requests scoped to
+that site (see SiteScopedMixin) keep the site's equipment, teams, requests,
+archive and rollups (SITE_MODELS) in that database, so each plant's data can
+live in its own database. Users, sessions, the event feed and jobs stay on
+default. Each site database holds the full schema (`migrate --database=<alias>`),
+its own Site row and a mirror of the users (see mirror_user), which the site
+tables reference. Maintenance tasks that are not tied to one request
+(archival, escalation, rollup rebuilds) run once per database through
+each_database().
+"""
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.db.models import Q
+from rest_framework.throttling import BaseThrottle
+
+
+_read_alias = ContextVar('read_alias', default=None)
+_site_alias = ContextVar('site_alias', default=None)
+
+# Models partitioned by site; everything else stays on default
+SITE_MODELS = {
+    'maintenance.site',
+    'maintenance.equipment',
+    'maintenance.maintenanceteam',
+    'maintenance.maintenanceteam_members',
+    'maintenance.maintenancerequest',
+    'maintenance.archivedmaintenancerequest',
+    'maintenance.equipmentdailystats',
+    'maintenance.teamdailystats',
+}
+
+
+def site_database(code):
+    """Database alias configured for a site code, or None for default."""
+    return settings.SITE_DATABASES.get(code)
+
+
+@contextmanager
+def use_site_database(alias):
+    """Route every query in the block to the given site database (no-op for None)."""
+    token = _site_alias.set(alias)
+    try:
+        yield
+    finally:
+        _site_alias.reset(token)
+
+
+def each_database():
+    """Yield default and then each site database alias, with site models routed to it."""
+    for alias in [DEFAULT_DB_ALIAS, *sorted(set(settings.SITE_DATABASES.values()) - {DEFAULT_DB_ALIAS})]:
+        with use_site_database(alias):
+            yield alias
+
+
+def database_events(alias):
+    """
+    Q matching the events of requests stored in the given database.
+
+    Events live on default and name their request's site, while request IDs
+    are only unique within one database.
+    """
+    if alias == DEFAULT_DB_ALIAS:
+        return ~Q(site__in=list(settings.SITE_DATABASES))
+    return Q(site__in=[code for code, site_alias in settings.SITE_DATABASES.items() if site_alias == alias])
+
+
+@contextmanager
+def atomic(*models):
+    """One transaction on each database the given models write to."""
+    with ExitStack() as stack:
+        for alias in dict.fromkeys(router.db_for_write(model) for model in models):
+            stack.enter_context(transaction.atomic(using=alias))
+        yield
+
+
+def user_fields(user):
+    """Field values of a user, for copying it into another database."""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields if not field.primary_key
+    }
+
+
+def mirror_user(sender, instance, using, raw=False, **kwargs):
+    """post_save: copy a user saved on default into every site database."""
+    if raw or using != DEFAULT_DB_ALIAS:
+        return
+    for alias in set(settings.SITE_DATABASES.values()):
+        sender.objects.using(alias).update_or_create(pk=instance.pk, defaults=user_fields(instance))
+
+
+def unmirror_user(sender, instance, using, **kwargs):
+    """post_delete: remove a user deleted on default from every site database."""
+    if using != DEFAULT_DB_ALIAS:
+        return
+    for alias in set(settings.SITE_DATABASES.values()):
+        sender.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def _pin_key(request):
+    # Client address as DRF resolves it, honouring REST_FRAMEWORK['NUM_PROXIES']
+    return f'db-pinned:{BaseThrottle().get_ident(request)}'
+
+
+class DatabaseRouter:
+    """
+    Route site models to the current site database, if any; otherwise reads
+    to the alias chosen for the request and writes to default.
+    """
+
+    def db_for_read(self, model, **hints):
+        site_alias = _site_alias.get()
+        if site_alias:
+            if model._meta.label_lower in SITE_MODELS:
+                return site_alias
+            instance = hints.get('instance')
+            if instance is not None and instance._state.db == site_alias:
+                # Users related to site rows, e.g. team members joined through
+                # the site's membership table, come from the site's mirror
+                return site_alias
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        site_alias = _site_alias.get()
+        if site_alias and model._meta.label_lower in SITE_MODELS:
+            return site_alias
+        # Explicit, so instances loaded from the replica are saved to default
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        shared = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        sites = set(settings.SITE_DATABASES.values())
+        aliases = {obj1._state.db, obj2._state.db}
+        # Site rows may point at users on default, which are mirrored into each
+        # site database; rows of two different sites may not be related
+        if aliases <= shared | sites and len(aliases & sites) <= 1:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.alias = settings.REPLICA_DATABASE
+        self.paths = tuple(settings.REPLICA_ROUTED_PATHS)
+        self.sticky_seconds = settings.REPLICA_STICKY_SECONDS
+
+    def __call__(self, request):
+        if not self.alias:
+            return self.get_response(request)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            try:
+                return self.get_response(request)
+            finally:
+                cache.set(_pin_key(request), True, self.sticky_seconds)
+
+        if not request.path.startswith(self.paths) or cache.get(_pin_key(request)):
+            return self.get_response(request)
+
+        token = _read_alias.set(self.alias)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Equipment, MaintenanceTeam, MaintenanceRequest
+from .models import (
+    Site,
+    Equipment,
+    MaintenanceTeam,
+    MaintenanceRequest,
+    ArchivedMaintenanceRequest,
+    RequestEvent,
+    Job,
+    RequestProfile,
+)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -10,6 +19,29 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
 
+class TechnicianSerializer(UserSerializer):
+    """User serializer with team membership and open workload."""
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
+    team_ids = serializers.PrimaryKeyRelatedField(
+        source='maintenance_teams',
+        many=True,
+        read_only=True
+    )
+    open_request_count = serializers.IntegerField(read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['full_name', 'team_ids', 'open_request_count']
+
+
+class SiteSerializer(serializers.ModelSerializer):
+    """Serializer for Site."""
+
+    class Meta:
+        model = Site
+        fields = ['id', 'code', 'name', 'created_at']
+        read_only_fields = ['created_at']
+
+
 class MaintenanceTeamSerializer(serializers.ModelSerializer):
     """Serializer for MaintenanceTeam."""
     members = UserSerializer(many=True, read_only=True)
@@ -23,7 +55,7 @@ class MaintenanceTeamSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MaintenanceTeam
-        fields = ['id', 'name', 'members', 'member_ids', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'site', 'members', 'member_ids', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
@@ -38,7 +70,7 @@ class EquipmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Equipment
         fields = [
-            'id', 'name', 'serial_number', 'department_or_owner', 'location',
+            'id', 'name', 'serial_number', 'site', 'department_or_owner', 'location',
             'purchase_date', 'warranty_end', 'default_team', 'default_team_name',
             'default_technician', 'default_technician_name', 'is_usable',
             'created_at', 'updated_at'
@@ -46,6 +78,69 @@ class EquipmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
+class EquipmentHealthSerializer(EquipmentSerializer):
+    """Equipment serializer including annotated maintenance health fields."""
+    open_request_count = serializers.IntegerField(read_only=True)
+    last_repaired_at = serializers.DateTimeField(read_only=True)
+    next_scheduled_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(EquipmentSerializer.Meta):
+        fields = EquipmentSerializer.Meta.fields + [
+            'open_request_count', 'last_repaired_at', 'next_scheduled_at'
+        ]
+
+
+class EquipmentFilterSerializer(serializers.Serializer):
+    """
+    Facet filters for the equipment list.
+
+    Repeat a parameter to match any of its values (?location=A&location=B);
+    default_team=none matches equipment without a default team.
+    """
+    department_or_owner = serializers.ListField(child=serializers.CharField(), required=False)
+    location = serializers.ListField(child=serializers.CharField(), required=False)
+    default_team = serializers.ListField(child=serializers.CharField(), required=False)
+    # A default keeps an absent query param from reading as False
+    is_usable = serializers.BooleanField(allow_null=True, default=None)
+    facets = serializers.BooleanField(default=False)
+
+    def validate_default_team(self, value):
+        """Team IDs, with 'none' for no team."""
+        teams = []
+        for item in value:
+            if item.lower() == 'none':
+                teams.append(None)
+            elif item.isdigit():
+                teams.append(int(item))
+            else:
+                raise serializers.ValidationError(f'Must be a team ID or "none", not "{item}".')
+        return teams
+
+    def get_filters(self):
+        """Active filters as {facet name: list of values}."""
+        data = self.validated_data
+        filters = {
+            name: data[name]
+            for name in ('department_or_owner', 'location', 'default_team')
+            if data.get(name)
+        }
+        if data['is_usable'] is not None:
+            filters['is_usable'] = [data['is_usable']]
+        return filters
+
+
+class EquipmentDecommissionSerializer(serializers.Serializer):
+    """Serializer for bulk equipment decommissioning."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=10000
+    )
+    mode = serializers.ChoiceField(choices=['archive', 'delete'], default='archive')
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+    background = serializers.BooleanField(default=False)
+
+
 class MaintenanceRequestSerializer(serializers.ModelSerializer):
     """Serializer for MaintenanceRequest with business logic validation."""
     equipment_name = serializers.CharField(source='equipment.name', read_only=True)
@@ -62,12 +157,13 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = MaintenanceRequest
         fields = [
-            'id', 'subject', 'equipment', 'equipment_name', 'request_type',
+            'id', 'subject', 'equipment', 'equipment_name', 'site', 'request_type',
             'team', 'team_name', 'technician', 'technician_name',
             'scheduled_date', 'duration', 'status', 'created_by',
-            'created_by_name', 'created_at', 'updated_at'
+            'created_by_name', 'created_at', 'updated_at', 'version',
+            'due_at', 'escalated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['site', 'created_at', 'updated_at', 'version', 'due_at', 'escalated_at']
 
     def validate(self, data):
         """Validate business rules."""
@@ -112,10 +208,70 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
         return value
 
 
+class ArchivedMaintenanceRequestSerializer(MaintenanceRequestSerializer):
+    """Read-only serializer for archived maintenance requests."""
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta(MaintenanceRequestSerializer.Meta):
+        model = ArchivedMaintenanceRequest
+        fields = MaintenanceRequestSerializer.Meta.fields + ['archived', 'archived_at']
+        read_only_fields = fields
+
+
+class CombinedMaintenanceRequestSerializer(MaintenanceRequestSerializer):
+    """Read-only serializer for the live + archived audit view."""
+    archived = serializers.BooleanField(read_only=True)
+
+    class Meta(MaintenanceRequestSerializer.Meta):
+        fields = MaintenanceRequestSerializer.Meta.fields + ['archived']
+        read_only_fields = fields
+
+
 class MaintenanceRequestCreateSerializer(MaintenanceRequestSerializer):
     """Serializer for creating maintenance requests."""
     class Meta(MaintenanceRequestSerializer.Meta):
-        read_only_fields = ['team', 'created_at', 'updated_at']
+        read_only_fields = ['team', 'site', 'created_at', 'updated_at', 'version', 'due_at', 'escalated_at']
+
+
+class RequestFilterSerializer(serializers.Serializer):
+    """Query parameters for filtering maintenance request lists."""
+    status = serializers.ChoiceField(choices=MaintenanceRequest.STATUS_CHOICES, required=False)
+    request_type = serializers.ChoiceField(
+        choices=MaintenanceRequest.REQUEST_TYPE_CHOICES,
+        required=False
+    )
+    equipment = serializers.IntegerField(required=False)
+    team = serializers.IntegerField(required=False)
+    technician = serializers.IntegerField(required=False)
+    scheduled_from = serializers.DateField(required=False)
+    scheduled_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        """Validate date range."""
+        if (data.get('scheduled_from') and data.get('scheduled_to')
+                and data['scheduled_from'] > data['scheduled_to']):
+            raise serializers.ValidationError({
+                'scheduled_to': 'End date must not be before start date.'
+            })
+        return data
+
+
+class BoardQuerySerializer(serializers.Serializer):
+    """Query parameters for the requests board."""
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    cursor = serializers.CharField(required=False)
+
+    def validate(self, data):
+        """A cursor continues a single column, so status is required with it."""
+        if data.get('cursor') and not self.initial_data.get('status'):
+            raise serializers.ValidationError({'status': 'Required when loading more with a cursor.'})
+        return data
+
+
+class OverdueQuerySerializer(serializers.Serializer):
+    """Query parameters for the overdue requests list."""
+    # A default keeps an absent query param from reading as False
+    escalated = serializers.BooleanField(allow_null=True, default=None)
 
 
 class StatusUpdateSerializer(serializers.Serializer):
@@ -181,3 +337,111 @@ class CalendarEventSerializer(serializers.Serializer):
     technician = serializers.CharField()
     status = serializers.CharField()
     request_type = serializers.CharField()
+
+
+class RequestEventSerializer(serializers.ModelSerializer):
+    """Serializer for request change-feed events."""
+    technician_name = serializers.CharField(
+        source='technician.get_full_name',
+        read_only=True,
+        default=None
+    )
+
+    class Meta:
+        model = RequestEvent
+        fields = [
+            'id', 'request', 'event_type', 'from_status', 'to_status',
+            'technician', 'technician_name', 'actor', 'site', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters for maintenance analytics."""
+    group_by = serializers.ChoiceField(
+        choices=['equipment', 'team', 'department', 'location'],
+        default='equipment'
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, data):
+        """Validate date range."""
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise serializers.ValidationError({'end': 'End date must not be before start date.'})
+        return data
+
+
+class CapacityQuerySerializer(serializers.Serializer):
+    """Query parameters for the capacity forecast."""
+    bucket = serializers.ChoiceField(choices=['day', 'week'], default='week')
+    weeks = serializers.IntegerField(min_value=1, max_value=52, default=12)
+    start = serializers.DateField(required=False)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background job status."""
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'params', 'status', 'attempts', 'max_attempts',
+            'progress', 'result', 'error', 'run_after', 'created_at',
+            'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    """Serializer for stored request profiles (the profile data itself is downloaded)."""
+
+    class Meta:
+        model = RequestProfile
+        fields = [
+            'id', 'method', 'path', 'query_string', 'mode', 'status_code',
+            'duration_ms', 'sql_count', 'sql_time_ms', 'queries', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class ArchiveJobParamsSerializer(serializers.Serializer):
+    """Parameters for an archive_requests job."""
+    older_than_days = serializers.IntegerField(min_value=0, default=365)
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=500)
+
+
+class RollupJobParamsSerializer(serializers.Serializer):
+    """Parameters for a rebuild_rollups job."""
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+class EscalateJobParamsSerializer(serializers.Serializer):
+    """Parameters for an escalate_overdue job."""
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=500)
+
+
+class JobCreateSerializer(serializers.Serializer):
+    """
+    Serializer for enqueuing a background job.
+
+    Only maintenance jobs can be queued directly. Decommission jobs are queued
+    by POST /api/equipment/decommission/, which checks the equipment against
+    the request's site.
+    """
+    PARAM_SERIALIZERS = {
+        'archive_requests': ArchiveJobParamsSerializer,
+        'rebuild_rollups': RollupJobParamsSerializer,
+        'escalate_overdue': EscalateJobParamsSerializer,
+    }
+
+    kind = serializers.ChoiceField(choices=list(PARAM_SERIALIZERS))
+    params = serializers.DictField(required=False, default=dict)
+    max_attempts = serializers.IntegerField(min_value=1, max_value=10, default=3)
+
+    def validate(self, data):
+        """Validate params against the job kind."""
+        params = self.PARAM_SERIALIZERS[data['kind']](data=data['params'])
+        if not params.is_valid():
+            raise serializers.ValidationError({'params': params.errors})
+        data['params'] = dict(params.validated_data)
+        return data
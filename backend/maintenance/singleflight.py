@@ -0,0 +1,220 @@
+"""
+Single-flight coalescing of identical concurrent GET requests.
+
+When many clients ask for the same expensive read at once (dashboards at
+shift change), the first request computes the response and the others wait
+for it and receive a copy of its rendered bytes. Nothing is kept once the
+computation finishes, so a request that arrives afterwards always recomputes.
+
+Requests are keyed on path, query string, Accept header, site, the
+database the read is routed to (replica or primary) and data version.
+The data version is the newest RequestEvent ID plus a write stamp kept in the
+cache and renewed after every write, so a read issued after a write never
+joins a computation that started before it. Flights only form within one
+worker, but the stamp is seen by every worker sharing the cache, so use a
+shared cache backend when running several workers.
+
+Under ASGI, Django runs the sync middleware chain for each request in its own
+thread, so the threaded path serves both servers; the asyncio path is used
+when every middleware below this one is async-capable.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import routers
+from .models import RequestEvent
+
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+WRITE_STAMP_KEY = 'single-flight:write-stamp'
+
+# In-flight computations, shared by every handler in the process
+_flights = {}
+_flights_lock = threading.Lock()
+_async_flights = {}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _note_write():
+    cache.set(WRITE_STAMP_KEY, time.time_ns(), None)
+
+
+async def _anote_write():
+    await cache.aset(WRITE_STAMP_KEY, time.time_ns(), None)
+
+
+def stats():
+    """Counters for this worker process."""
+    with _stats_lock:
+        return {
+            'leaders': _stats['leaders'],
+            'shared': _stats['shared'],
+            'timeouts': _stats['timeouts'],
+            'uncacheable': _stats['uncacheable'],
+        }
+
+
+def _latest_event_id():
+    return RequestEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+async def _alatest_event_id():
+    return await RequestEvent.objects.order_by('-id').values_list('id', flat=True).afirst() or 0
+
+
+def _data_version():
+    return _latest_event_id(), cache.get_or_set(WRITE_STAMP_KEY, time.time_ns, None)
+
+
+async def _adata_version():
+    return await _alatest_event_id(), await cache.aget_or_set(WRITE_STAMP_KEY, time.time_ns, None)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.snapshot = None
+
+
+class SingleFlightMiddleware:
+    """
+    Coalesce concurrent identical GETs to SINGLE_FLIGHT_PATHS.
+
+    Followers wait up to SINGLE_FLIGHT_TIMEOUT seconds and then compute their
+    own response. Requests carrying credentials, and responses that are not
+    plain 200s (errors, streams, Set-Cookie), are never shared.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'SINGLE_FLIGHT_PATHS', ()))
+        self.timeout = getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', 10)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            try:
+                return self.get_response(request)
+            finally:
+                _note_write()
+        if not self.coalescable(request):
+            return self.get_response(request)
+
+        key = self.flight_key(request, _data_version())
+        with _flights_lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _flights[key] = _Flight()
+
+        if leader:
+            try:
+                response = self.get_response(request)
+                flight.snapshot = self.snapshot(response)
+            finally:
+                with _flights_lock:
+                    _flights.pop(key, None)
+                flight.done.set()
+            _count('leaders')
+            return response
+
+        if not flight.done.wait(self.timeout):
+            _count('timeouts')
+            return self.get_response(request)
+        if flight.snapshot is None:
+            _count('uncacheable')
+            return self.get_response(request)
+        _count('shared')
+        return self.replay(flight.snapshot)
+
+    async def __acall__(self, request):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            try:
+                return await self.get_response(request)
+            finally:
+                await _anote_write()
+        if not self.coalescable(request):
+            return await self.get_response(request)
+
+        loop = asyncio.get_running_loop()
+        key = (id(loop), *self.flight_key(request, await _adata_version()))
+        future = _async_flights.get(key)
+
+        if future is None:
+            future = _async_flights[key] = loop.create_future()
+            snapshot = None
+            try:
+                response = await self.get_response(request)
+                snapshot = self.snapshot(response)
+            finally:
+                _async_flights.pop(key, None)
+                future.set_result(snapshot)
+            _count('leaders')
+            return response
+
+        try:
+            snapshot = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            _count('timeouts')
+            return await self.get_response(request)
+        if snapshot is None:
+            _count('uncacheable')
+            return await self.get_response(request)
+        _count('shared')
+        return self.replay(snapshot)
+
+    def coalescable(self, request):
+        return (
+            request.method == 'GET'
+            and request.path.startswith(self.paths)
+            and 'HTTP_AUTHORIZATION' not in request.META
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            # A profiled request must run the view itself
+            and 'HTTP_X_PROFILE' not in request.META
+        )
+
+    @staticmethod
+    def flight_key(request, data_version):
+        return (
+            request.path,
+            request.META.get('QUERY_STRING', ''),
+            request.META.get('HTTP_ACCEPT', ''),
+            request.META.get('HTTP_X_SITE', ''),
+            # Replica or primary, so a client pinned to the primary after a write
+            # never shares a response read from a lagging replica
+            routers._read_alias.get(),
+            data_version,
+        )
+
+    @staticmethod
+    def snapshot(response):
+        """Rendered status, body and headers, or None when the response must not be shared."""
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return None
+        return response.status_code, response.content, list(response.headers.items())
+
+    @staticmethod
+    def replay(snapshot):
+        status_code, content, headers = snapshot
+        response = HttpResponse(content, status=status_code, headers=dict(headers))
+        response['X-Single-Flight'] = 'shared'
+        return response
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import analytics, archive
+from .models import (
+    Equipment,
+    MaintenanceTeam,
+    MaintenanceRequest,
+    ArchivedMaintenanceRequest,
+    EquipmentDailyStats,
+    TeamDailyStats,
+)
+from .views import UserPagination
+
+
+def rollup_rows():
+    """Every rollup row, without primary keys, for comparing tables."""
+    return {
+        model.__name__: sorted(
+            tuple(row.values())
+            for row in model.objects.order_by().values(
+                f'{model.dimension}_id', 'day', 'opened_count', 'corrective_count',
+                'preventive_count', 'repaired_count', 'scrapped_count', 'repair_time_total',
+            )
+        )
+        for model in (EquipmentDailyStats, TeamDailyStats)
+    }
+
+
+class IncrementalRollupTests(TestCase):
+    """The rollups kept by API writes must match a full analytics.rebuild()."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teams = [MaintenanceTeam.objects.create(name=f'Team {index}') for index in range(2)]
+        self.equipment = [
+            Equipment.objects.create(
+                name=f'Pump {index}',
+                serial_number=f'SN-{index}',
+                department_or_owner='Production',
+                location='Hall A',
+                purchase_date=date(2024, 1, 1),
+                default_team=team,
+            )
+            for index, team in enumerate(self.teams)
+        ]
+
+    def create_request(self, equipment, request_type='CORRECTIVE'):
+        response = self.client.post('/api/requests/', {
+            'subject': 'Leak',
+            'equipment': equipment.pk,
+            'request_type': request_type,
+            'scheduled_date': timezone.now().isoformat(),
+            'duration': 2,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def assertMatchesRebuild(self):
+        incremental = rollup_rows()
+        analytics.rebuild()
+        self.assertEqual(incremental, rollup_rows())
+
+    def test_create(self):
+        self.create_request(self.equipment[0])
+        self.create_request(self.equipment[0], 'PREVENTIVE')
+        self.assertMatchesRebuild()
+
+    def test_update_moves_counts(self):
+        self.create_request(self.equipment[0])
+        request_id = self.create_request(self.equipment[0])
+        for change in ({'request_type': 'PREVENTIVE'}, {'equipment': self.equipment[1].pk}, {'team': self.teams[0].pk}):
+            response = self.client.patch(f'/api/requests/{request_id}/', change, format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertMatchesRebuild()
+
+    def test_update_after_repair(self):
+        request_id = self.create_request(self.equipment[0])
+        for status in ('IN_PROGRESS', 'REPAIRED'):
+            response = self.client.patch(f'/api/requests/{request_id}/', {'status': status}, format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+        self.assertMatchesRebuild()
+        self.client.patch(f'/api/requests/{request_id}/', {'equipment': self.equipment[1].pk}, format='json')
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        self.create_request(self.equipment[0])
+        request_id = self.create_request(self.equipment[0])
+        response = self.client.delete(f'/api/requests/{request_id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertMatchesRebuild()
+
+
+class ArchiveTests(TestCase):
+    """Archiving must never delete a request it did not copy into the archive."""
+
+    def setUp(self):
+        equipment = Equipment.objects.create(
+            name='Press', serial_number='SN-P', department_or_owner='Production',
+            location='Hall B', purchase_date=date(2024, 1, 1),
+        )
+        self.requests = [
+            MaintenanceRequest.objects.create(
+                subject=f'Job {index}', equipment=equipment, request_type='CORRECTIVE',
+                scheduled_date=timezone.now(), duration=timedelta(hours=1), status='REPAIRED',
+            )
+            for index in range(3)
+        ]
+        self.cutoff = timezone.now() + timedelta(days=1)
+
+    def test_archives_closed_requests(self):
+        self.assertEqual(archive.archive_closed_requests(self.cutoff, batch_size=2), 3)
+        self.assertFalse(MaintenanceRequest.objects.exists())
+        self.assertEqual(ArchivedMaintenanceRequest.objects.count(), 3)
+
+    def test_keeps_requests_whose_id_is_already_archived(self):
+        clash = self.requests[1]
+        ArchivedMaintenanceRequest.objects.create(
+            id=clash.id, subject='Old copy', equipment=clash.equipment,
+            request_type='CORRECTIVE', scheduled_date=clash.scheduled_date, duration=timedelta(hours=1), status='REPAIRED',
+            created_at=clash.created_at, updated_at=clash.updated_at,
+        )
+        self.assertEqual(archive.archive_closed_requests(self.cutoff, batch_size=2), 2)
+        self.assertEqual(list(MaintenanceRequest.objects.values_list('id', flat=True)), [clash.id])
+
+
+class UserPaginationTests(TestCase):
+    """Pickers ask for a larger page of users, but never for all of them."""
+
+    def setUp(self):
+        User.objects.bulk_create([User(username=f'tech{index:03}') for index in range(120)])
+
+    def test_page_size_is_capped(self):
+        response = APIClient().get('/api/users/', {'page_size': 1000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 120)
+        self.assertEqual(len(response.json()['results']), UserPagination.max_page_size)
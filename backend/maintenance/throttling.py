@@ -0,0 +1,184 @@
+"""
+Token-bucket request throttling.
+
+Each (scope, client) pair owns a bucket holding up to N tokens for a rate of
+'N/period'. Tokens refill continuously and every request spends one, so
+clients may burst up to N requests and are then held to the average rate.
+
+Buckets live in process memory by default, so a check costs a dict lookup and
+a little arithmetic. Set THROTTLE_STORE to a SQLite file path to share the
+buckets between worker processes.
+"""
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_throttled = Counter()
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'120/min' -> (bucket capacity, tokens refilled per second)."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def stats():
+    """Throttled request counts per scope for this worker process."""
+    return dict(_throttled)
+
+
+class MemoryBucketStore:
+    """
+    Buckets in a plain dict, updated without locks.
+
+    Each update replaces the bucket's tuple in a single assignment. Two
+    concurrent requests from the same client can occasionally spend the same
+    token, which only lets a request through at the very edge of the limit.
+    """
+    max_buckets = 100000
+
+    def __init__(self):
+        self.buckets = {}
+
+    def take(self, key, capacity, refill_rate, now):
+        """Spend one token. Returns 0 when allowed, else seconds until a token is free."""
+        tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        wait = 0 if tokens >= 1 else (1 - tokens) / refill_rate
+        if not wait:
+            tokens -= 1
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+        if len(self.buckets) > self.max_buckets:
+            self.purge(now)
+        return wait
+
+    def purge(self, now):
+        """Drop buckets that have refilled completely; a missing bucket is a full one."""
+        for key, (_, _, full_at) in list(self.buckets.items()):
+            if full_at <= now:
+                self.buckets.pop(key, None)
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file shared by every worker on the host."""
+    idle_expiry = 86400
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            conn.execute('DELETE FROM throttle_bucket WHERE updated < ?', [time.time() - self.idle_expiry])
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, capacity, refill_rate, now):
+        """Spend one token. Returns 0 when allowed, else seconds until a token is free."""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM throttle_bucket WHERE key = ?', [key]).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / refill_rate
+            if not wait:
+                tokens -= 1
+            conn.execute(
+                'INSERT INTO throttle_bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                [key, tokens, now]
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        path = getattr(settings, 'THROTTLE_STORE', None)
+        _store = SQLiteBucketStore(path) if path else MemoryBucketStore()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket limited by the DEFAULT_THROTTLE_RATES entry named by scope.
+
+    Subclasses set scope, or override get_scope() to pick it per view. A
+    scope without a configured rate, including the default None, is not
+    limited.
+    """
+    scope = None
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_client_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE_ENABLED:
+            return True
+        scope = self.get_scope(view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        key = f'{scope}:{self.get_client_key(request)}'
+        self.wait_time = get_store().take(key, capacity, refill_rate, time.time())
+        if self.wait_time:
+            _throttled[scope] += 1
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    """Overall budget per client across every endpoint (the 'client' rate)."""
+    scope = 'client'
+
+
+class RouteRateThrottle(TokenBucketThrottle):
+    """
+    Budget per client for one route.
+
+    The scope is the view's throttle_scope, else '<basename>-<action>' as
+    named by the router (e.g. 'request-list'). Routes without a configured
+    rate are not limited.
+    """
+
+    def get_scope(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return f'{getattr(view, "basename", None)}-{getattr(view, "action", None)}'
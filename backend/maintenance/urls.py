@@ -1,18 +1,36 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
+    SiteViewSet,
     EquipmentViewSet,
     MaintenanceTeamViewSet,
+    UserViewSet,
     MaintenanceRequestViewSet,
     CalendarViewSet,
+    RequestEventViewSet,
+    AnalyticsViewSet,
+    CapacityViewSet,
+    JobViewSet,
+    RequestProfileViewSet,
+    MetricsViewSet,
+    request_event_stream,
 )
 
 router = DefaultRouter()
+router.register(r'sites', SiteViewSet, basename='site')
 router.register(r'equipment', EquipmentViewSet, basename='equipment')
 router.register(r'teams', MaintenanceTeamViewSet, basename='team')
+router.register(r'users', UserViewSet, basename='user')
 router.register(r'requests', MaintenanceRequestViewSet, basename='request')
 router.register(r'calendar', CalendarViewSet, basename='calendar')
+router.register(r'events', RequestEventViewSet, basename='event')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'capacity', CapacityViewSet, basename='capacity')
+router.register(r'jobs', JobViewSet, basename='job')
+router.register(r'profiles', RequestProfileViewSet, basename='profile')
+router.register(r'metrics', MetricsViewSet, basename='metrics')
 
 urlpatterns = [
+    path('events/stream/', request_event_stream, name='event-stream'),
     path('', include(router.urls)),
 ]
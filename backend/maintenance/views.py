@@ -1,21 +1,278 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, filters
+from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from datetime import timedelta
-from .models import Equipment, MaintenanceTeam, MaintenanceRequest
+from django.db import router, transaction
+from django.db.models import (
+    BooleanField, Count, F, OuterRef, Prefetch, Q, Subquery, Value, Window,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+from datetime import datetime, time as datetime_time, timedelta
+import asyncio
+import base64
+import binascii
+import time
+from .models import (
+    Site,
+    Equipment,
+    MaintenanceTeam,
+    MaintenanceRequest,
+    ArchivedMaintenanceRequest,
+    RequestEvent,
+    Job,
+    RequestProfile,
+)
+from . import analytics, capacity, decommission, facets, jobs, routers, singleflight, throttling, warmup
+from .overdue import overdue_requests
 from .serializers import (
+    SiteSerializer,
     EquipmentSerializer,
+    EquipmentHealthSerializer,
+    EquipmentDecommissionSerializer,
+    EquipmentFilterSerializer,
     MaintenanceTeamSerializer,
+    UserSerializer,
+    TechnicianSerializer,
     MaintenanceRequestSerializer,
     MaintenanceRequestCreateSerializer,
+    ArchivedMaintenanceRequestSerializer,
+    CombinedMaintenanceRequestSerializer,
     StatusUpdateSerializer,
     TechnicianAssignSerializer,
     CalendarEventSerializer,
+    RequestEventSerializer,
+    AnalyticsQuerySerializer,
+    CapacityQuerySerializer,
+    JobSerializer,
+    JobCreateSerializer,
+    RequestProfileSerializer,
+    RequestFilterSerializer,
+    BoardQuerySerializer,
+    OverdueQuerySerializer,
 )
 
 
-class EquipmentViewSet(viewsets.ModelViewSet):
+def filter_requests(queryset, query_params):
+    """Apply the status, type, assignment and scheduled-date filters from query params."""
+    serializer = RequestFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    filters = serializer.validated_data
+
+    for field in ('status', 'request_type', 'equipment', 'team', 'technician'):
+        if field in filters:
+            queryset = queryset.filter(**{field: filters[field]})
+
+    # Compare against day boundaries so the scheduled_date index can be used
+    tz = timezone.get_current_timezone()
+    if 'scheduled_from' in filters:
+        start = datetime.combine(filters['scheduled_from'], datetime_time.min, tzinfo=tz)
+        queryset = queryset.filter(scheduled_date__gte=start)
+    if 'scheduled_to' in filters:
+        end = datetime.combine(filters['scheduled_to'] + timedelta(days=1), datetime_time.min, tzinfo=tz)
+        queryset = queryset.filter(scheduled_date__lt=end)
+    return queryset
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'This request was modified by someone else. Reload it and try again.'
+    default_code = 'precondition_failed'
+
+
+def request_etag(maintenance_request):
+    """ETag for a maintenance request: its row version."""
+    return f'"{maintenance_request.version}"'
+
+
+def check_if_match(request, maintenance_request):
+    """Raise PreconditionFailed unless If-Match, when sent, names the current version."""
+    header = request.headers.get('If-Match')
+    if not header or header.strip() == '*':
+        return
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    if request_etag(maintenance_request) not in tags:
+        raise PreconditionFailed()
+
+
+REQUEST_RELATED_FIELDS = ['equipment', 'team', 'technician', 'created_by']
+
+# Request fields that decide which daily rollup rows count a request
+ROLLUP_FIELDS = {'request_type', 'team', 'equipment'}
+
+ARCHIVED_MODES = {
+    'false': MaintenanceRequestSerializer,
+    'true': ArchivedMaintenanceRequestSerializer,
+    'all': CombinedMaintenanceRequestSerializer,
+}
+
+
+def get_archived_mode(query_params):
+    """Parse ?archived=: 'false' (live table), 'true' (archive) or 'all' (both)."""
+    mode = query_params.get('archived', 'false').lower()
+    if mode not in ARCHIVED_MODES:
+        raise ValidationError({'archived': f'Must be one of: {", ".join(ARCHIVED_MODES)}.'})
+    return mode
+
+
+def requests_for_mode(mode, live, archived, query_params):
+    """Filtered live, archived or combined request rows for an archived= mode."""
+    if mode == 'true':
+        return filter_requests(archived, query_params)
+    live = filter_requests(live, query_params)
+    if mode == 'false':
+        return live
+
+    # Both tables share column order; rows come back as MaintenanceRequest
+    # instances, so related objects are prefetched per page rather than joined.
+    combined = live.select_related(None).order_by().annotate(
+        archived=Value(False, output_field=BooleanField())
+    ).union(
+        filter_requests(archived, query_params).select_related(None).order_by().defer('archived_at').annotate(
+            archived=Value(True, output_field=BooleanField())
+        ),
+        all=True
+    )
+    return combined.order_by('-created_at', '-id')
+
+
+def encode_board_cursor(maintenance_request):
+    """Encode a card's (created_at, id) position as an opaque cursor."""
+    raw = f'{maintenance_request.created_at.isoformat()}|{maintenance_request.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_board_cursor(cursor):
+    """Decode a board cursor into (created_at, id), or None if it is malformed."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class SiteScopedMixin:
+    """
+    Scope a viewset to the site named by the X-Site header or ?site= (a site code).
+
+    Without a site the viewset covers every site. filter_site() narrows a
+    queryset through site_lookup, and new rows default to the request's site.
+    When SITE_DATABASES maps the site to its own database, the request's
+    site models are read from and written to that database.
+    """
+    site_lookup = 'site'
+
+    def dispatch(self, request, *args, **kwargs):
+        self.site_code = request.headers.get('X-Site') or request.GET.get('site') or None
+        # Resolve the session user on default before site routing starts
+        user = getattr(request, 'user', None)
+        if user is not None:
+            user.is_authenticated
+        with routers.use_site_database(routers.site_database(self.site_code)):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.site = None
+        if self.site_code:
+            self.site = Site.objects.filter(code=self.site_code).first()
+            if self.site is None:
+                raise ValidationError({'site': f'Unknown site: {self.site_code}'})
+
+    def filter_site(self, queryset, lookup=None):
+        """Restrict a queryset to the request's site, if one was given."""
+        if self.site is None:
+            return queryset
+        return queryset.filter(**{lookup or self.site_lookup: self.site})
+
+    def perform_create(self, serializer):
+        """Create rows in the request's site unless the payload names one."""
+        if self.site is not None and serializer.validated_data.get('site') is None:
+            serializer.save(site=self.site)
+        else:
+            serializer.save()
+
+
+class IncludeMixin:
+    """
+    Side-load related objects with ?include=a,b on list and retrieve.
+
+    include_options maps each include name to (foreign key field, serializer
+    class, queryset factory). Related rows are de-duplicated by ID and fetched
+    with one query per include, so the cost does not grow with page size.
+    """
+    include_options = {}
+
+    def get_includes(self):
+        """Parse and validate the requested include names."""
+        raw = self.request.query_params.get('include', '')
+        names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.include_options]
+        if unknown:
+            raise ValidationError({
+                'include': f'Unknown include: {", ".join(unknown)}. '
+                           f'Options: {", ".join(self.include_options)}'
+            })
+        return names
+
+    def get_included(self, objects, names):
+        """Serialize the related objects referenced by the given rows."""
+        included = {}
+        for name in names:
+            field, serializer_class, get_related = self.include_options[name]
+            ids = {getattr(obj, f'{field}_id') for obj in objects} - {None}
+            related = get_related().filter(pk__in=ids) if ids else []
+            included[name] = serializer_class(related, many=True).data
+        return included
+
+    def list(self, request, *args, **kwargs):
+        names = self.get_includes()
+        if not names:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else list(queryset)
+        data = self.get_serializer(objects, many=True).data
+
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response({'results': data})
+        response.data['included'] = self.get_included(objects, names)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        names = self.get_includes()
+        if not names:
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        data = dict(self.get_serializer(instance).data)
+        data['included'] = self.get_included([instance], names)
+        return Response(data)
+
+
+class SiteViewSet(viewsets.ModelViewSet):
+    """
+    API endpoint for sites (plants).
+
+    Other endpoints are scoped to a site with the X-Site header or ?site=code.
+    """
+    queryset = Site.objects.all()
+    serializer_class = SiteSerializer
+
+
+class EquipmentViewSet(SiteScopedMixin, IncludeMixin, viewsets.ModelViewSet):
     """
     API endpoint for equipment management.
     
@@ -23,56 +280,349 @@ class EquipmentViewSet(viewsets.ModelViewSet):
     retrieve: Get single equipment by ID
     create: Create new equipment
     update: Update equipment
-    destroy: Delete equipment
+    destroy: Delete equipment (set-based, including request history)
     requests: Get all maintenance requests for specific equipment
+    decommission: Archive (mark unusable) or delete many equipment at once
+
+    list/retrieve accept ?health=true to include open_request_count,
+    last_repaired_at and next_scheduled_at, and ?include=team,technician
+    to side-load the default team and technician.
+
+    list filters on department_or_owner, location, default_team and
+    is_usable; ?facets=true adds the value counts for each of them.
     """
     queryset = Equipment.objects.all()
     serializer_class = EquipmentSerializer
+    include_options = {
+        'team': (
+            'default_team', MaintenanceTeamSerializer,
+            lambda: MaintenanceTeam.objects.prefetch_related('members')
+        ),
+        'technician': ('default_technician', UserSerializer, lambda: User.objects.all()),
+    }
+
+    def include_health(self):
+        """Whether health annotations were requested for a read action."""
+        return (
+            self.action in ('list', 'retrieve')
+            and self.request.query_params.get('health', '').lower() in ('1', 'true', 'yes')
+        )
+
+    def get_queryset(self):
+        """Join default team/technician and annotate health when requested."""
+        queryset = self.filter_site(Equipment.objects.select_related('default_team', 'default_technician'))
+        if self.include_health():
+            queryset = queryset.with_health()
+        return queryset
+
+    def get_serializer_class(self):
+        """Use the health serializer when health annotations are included."""
+        if self.include_health():
+            return EquipmentHealthSerializer
+        return EquipmentSerializer
+
+    def filter_queryset(self, queryset):
+        """Apply the facet filters to list queries."""
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = facets.apply_filters(queryset, self.facet_query.get_filters())
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """List equipment matching the facet filters, with cached facet counts on request."""
+        self.facet_query = EquipmentFilterSerializer(data=request.query_params)
+        self.facet_query.is_valid(raise_exception=True)
+        response = super().list(request, *args, **kwargs)
+        if self.facet_query.validated_data['facets']:
+            response.data['facets'] = facets.counts(
+                self.filter_site(Equipment.objects.all()),
+                self.facet_query.get_filters(),
+                scope=self.site.code if self.site else '',
+            )
+        return response
+
+    def perform_update(self, serializer):
+        """Move the equipment's live and archived requests along when its site changes."""
+        old_site_id = serializer.instance.site_id
+        with transaction.atomic(using=router.db_for_write(Equipment)):
+            equipment = serializer.save()
+            if equipment.site_id != old_site_id:
+                for model in (MaintenanceRequest, ArchivedMaintenanceRequest):
+                    model.objects.filter(equipment=equipment).update(site=equipment.site_id)
+
+    def perform_destroy(self, instance):
+        """Delete history with batched DELETEs instead of the in-memory collector."""
+        decommission.delete_equipment([instance.pk], actor=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='decommission')
+    def decommission(self, request):
+        """
+        Bulk decommission equipment.
+
+        mode=archive marks the equipment unusable; mode=delete removes it and
+        its request history. Both run in batched set-based transactions and
+        report per-batch progress in the response. With background=true the
+        work is queued as a job and 202 is returned with the job to poll.
+        """
+        serializer = EquipmentDecommissionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        requested = list(dict.fromkeys(serializer.validated_data['ids']))
+        existing = set(
+            self.filter_site(Equipment.objects.filter(id__in=requested)).values_list('id', flat=True)
+        )
+        ids = [pk for pk in requested if pk in existing]
+        batch_size = serializer.validated_data['batch_size']
+        not_found = [pk for pk in requested if pk not in existing]
+
+        if serializer.validated_data['background']:
+            job = jobs.enqueue('decommission_equipment', {
+                'ids': ids,
+                'mode': serializer.validated_data['mode'],
+                'batch_size': batch_size,
+                'site': self.site_code,
+            })
+            return Response(
+                {'job': JobSerializer(job).data, 'not_found': not_found},
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        progress = []
+        if serializer.validated_data['mode'] == 'delete':
+            totals = decommission.delete_equipment(ids, batch_size, progress.append, actor=request.user)
+        else:
+            totals = {'equipment': decommission.archive_equipment(ids, batch_size, progress.append)}
+
+        return Response({
+            'mode': serializer.validated_data['mode'],
+            'totals': totals,
+            'progress': progress,
+            'not_found': not_found,
+        })
 
     @action(detail=True, methods=['get'], url_path='requests')
     def requests(self, request, pk=None):
-        """Get all maintenance requests for this equipment."""
+        """Get paginated maintenance requests for this equipment (same filters as /requests/)."""
         equipment = self.get_object()
-        requests = equipment.maintenance_requests.all()
-        serializer = MaintenanceRequestSerializer(requests, many=True)
+        mode = get_archived_mode(request.query_params)
+        requests = requests_for_mode(
+            mode,
+            equipment.maintenance_requests.select_related(*REQUEST_RELATED_FIELDS),
+            equipment.archived_requests.select_related(*REQUEST_RELATED_FIELDS),
+            request.query_params
+        )
+        serializer_class = ARCHIVED_MODES[mode]
+
+        page = self.paginate_queryset(requests)
+        if page is not None:
+            if mode == 'all':
+                prefetch_related_objects(page, *REQUEST_RELATED_FIELDS)
+            serializer = serializer_class(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(requests, many=True)
         return Response(serializer.data)
 
 
-class MaintenanceTeamViewSet(viewsets.ModelViewSet):
+class MaintenanceTeamViewSet(SiteScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for maintenance team management.
+
+    Scoped to a site, lists that site's teams plus teams shared by all sites.
     """
-    queryset = MaintenanceTeam.objects.all()
+    queryset = MaintenanceTeam.objects.prefetch_related('members')
     serializer_class = MaintenanceTeamSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.site is None:
+            return queryset
+        return queryset.filter(Q(site=self.site) | Q(site__isnull=True))
+
+
+class UserPagination(PageNumberPagination):
+    """Pickers ask for one larger page with ?page_size=, capped so no request lists every user."""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class UserViewSet(SiteScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for technicians (active users) with workload.
+
+    list: Get users with team_ids and open_request_count (?search=, ?team=, ?page_size= up to 100);
+          with X-Site or ?site=, counts and teams cover that site only
+    retrieve: Get single user by ID
+    """
+    serializer_class = TechnicianSerializer
+    pagination_class = UserPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['username', 'first_name', 'last_name', 'email']
+    ordering_fields = ['username', 'first_name', 'last_name', 'open_request_count']
+    ordering = ['username']
+
+    def get_queryset(self):
+        """Annotate open requests and prefetch team IDs: one query per page plus one for teams."""
+        open_requests = self.filter_site(MaintenanceRequest.objects.filter(
+            technician=OuterRef('pk'),
+            status__in=MaintenanceRequest.OPEN_STATUSES
+        )).order_by().values('technician').annotate(count=Count('id')).values('count')
+
+        # Users are mirrored into each site database, so the count subquery
+        # runs next to the site's requests
+        users = User.objects.using(router.db_for_read(MaintenanceRequest))
+        teams = MaintenanceTeam.objects.only('id')
+        if self.site is not None:
+            teams = teams.filter(Q(site=self.site) | Q(site__isnull=True))
+        queryset = users.filter(is_active=True).annotate(
+            open_request_count=Coalesce(Subquery(open_requests), 0)
+        ).prefetch_related(Prefetch('maintenance_teams', queryset=teams))
+
+        team = self.request.query_params.get('team')
+        if team and team.isdigit():
+            queryset = queryset.filter(maintenance_teams=team)
+        return queryset
 
-class MaintenanceRequestViewSet(viewsets.ModelViewSet):
+
+class MaintenanceRequestViewSet(SiteScopedMixin, IncludeMixin, viewsets.ModelViewSet):
     """
     API endpoint for maintenance request management.
     
-    list: Get all maintenance requests
+    list: Get all maintenance requests (filter by status, request_type, equipment,
+          team, technician, scheduled_from, scheduled_to)
     retrieve: Get single request by ID
     create: Create new request (auto-assigns team from equipment)
     update: Update request
     destroy: Delete request
     status: Update request status (validates workflow)
     assign: Assign technician (validates team membership)
+
+    Single-request responses carry the row version as an ETag; updates,
+    status, assign and delete honour If-Match and return 412 on conflict.
+
+    list/retrieve accept ?include=equipment,team,technician to side-load
+    related objects in an "included" section, and ?archived=true to read
+    archived requests instead of live ones (list also takes ?archived=all).
     """
-    queryset = MaintenanceRequest.objects.all()
+    queryset = MaintenanceRequest.objects.select_related(*REQUEST_RELATED_FIELDS)
     serializer_class = MaintenanceRequestSerializer
+    include_options = {
+        'equipment': (
+            'equipment', EquipmentSerializer,
+            lambda: Equipment.objects.select_related('default_team', 'default_technician')
+        ),
+        'team': (
+            'team', MaintenanceTeamSerializer,
+            lambda: MaintenanceTeam.objects.prefetch_related('members')
+        ),
+        'technician': ('technician', UserSerializer, lambda: User.objects.all()),
+    }
+
+    def get_archived_mode(self):
+        """Archive mode for reads; writes and custom actions always use the live table."""
+        if self.action == 'list':
+            return get_archived_mode(self.request.query_params)
+        if self.action == 'retrieve':
+            mode = get_archived_mode(self.request.query_params)
+            if mode == 'all':
+                raise ValidationError({'archived': 'Use true or false when retrieving a single request.'})
+            return mode
+        return 'false'
+
+    def get_queryset(self):
+        """Apply list filters and select the live or archived table."""
+        queryset = self.filter_site(super().get_queryset())
+        mode = self.get_archived_mode()
+        archived = self.filter_site(ArchivedMaintenanceRequest.objects.select_related(*REQUEST_RELATED_FIELDS))
+        if self.action == 'list':
+            return requests_for_mode(mode, queryset, archived, self.request.query_params)
+        if mode == 'true':
+            return archived
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        """Prefetch related objects for combined pages, which cannot be joined."""
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.action == 'list' and self.get_archived_mode() == 'all':
+            prefetch_related_objects(page, *REQUEST_RELATED_FIELDS)
+        return page
 
     def get_serializer_class(self):
-        """Use different serializer for create."""
+        """Use different serializer for create and archived reads."""
         if self.action == 'create':
             return MaintenanceRequestCreateSerializer
-        return MaintenanceRequestSerializer
+        return ARCHIVED_MODES[self.get_archived_mode()]
 
     def perform_create(self, serializer):
         """Auto-set created_by to current user if available."""
-        if self.request.user.is_authenticated:
-            serializer.save(created_by=self.request.user)
-        else:
-            serializer.save()
+        equipment = serializer.validated_data['equipment']
+        if self.site is not None and equipment.site_id != self.site.id:
+            raise ValidationError({'equipment': f'Equipment does not belong to site {self.site.code}.'})
+
+        with routers.atomic(MaintenanceRequest, RequestEvent):
+            if self.request.user.is_authenticated:
+                instance = serializer.save(created_by=self.request.user)
+            else:
+                instance = serializer.save()
+            RequestEvent.record(instance, 'CREATED', actor=self.request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Expose the row version as an ETag on single-request responses."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        data = getattr(response, 'data', None)
+        if response.status_code < 300 and isinstance(data, dict) and 'version' in data:
+            response['ETag'] = f'"{data["version"]}"'
+        return response
+
+    def perform_update(self, serializer):
+        """
+        Write only the changed fields, conditional on the version that was read.
+
+        Honours If-Match; a concurrent write returns 412 instead of being
+        silently overwritten. Status and technician changes are logged.
+        """
+        instance = serializer.instance
+        check_if_match(self.request, instance)
+        expected_version = instance.version
+        old_status = instance.status
+        old_technician_id = instance.technician_id
+
+        changed = []
+        for field, value in serializer.validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
+        if ('equipment' in changed or 'team' in changed) and instance.assign_default_team():
+            changed.append('team')
+        if 'equipment' in changed and instance.assign_site():
+            changed.append('site')
+        if not changed:
+            return
+
+        with routers.atomic(MaintenanceRequest, RequestEvent):
+            # Moving a request between rollup buckets: take its counts out of
+            # the old buckets and add them to the new ones
+            before = analytics.contributions([instance.pk]) if ROLLUP_FIELDS.intersection(changed) else None
+            if not instance.save_changes(changed, expected_version):
+                raise PreconditionFailed()
+            if before is not None:
+                analytics.apply_contributions(analytics.contributions([instance.pk]), removed=before)
+            if instance.status != old_status:
+                RequestEvent.record(
+                    instance, 'STATUS_CHANGED',
+                    from_status=old_status, actor=self.request.user
+                )
+            if instance.technician_id != old_technician_id:
+                RequestEvent.record(instance, 'ASSIGNED', actor=self.request.user)
+
+    def perform_destroy(self, instance):
+        """Log deletion so feed consumers can drop the request, and take it out of the rollups."""
+        check_if_match(self.request, instance)
+        with routers.atomic(MaintenanceRequest, RequestEvent):
+            analytics.apply_contributions({}, removed=analytics.contributions([instance.pk]))
+            RequestEvent.record(instance, 'DELETED', actor=self.request.user)
+            instance.delete()
 
     @action(detail=True, methods=['post', 'patch'], url_path='status')
     def update_status(self, request, pk=None):
@@ -81,6 +631,7 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         Validates workflow: NEW → IN_PROGRESS → REPAIRED → SCRAP
         """
         maintenance_request = self.get_object()
+        check_if_match(request, maintenance_request)
         serializer = StatusUpdateSerializer(
             data=request.data,
             context={'request_obj': maintenance_request}
@@ -88,8 +639,18 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             new_status = serializer.validated_data['status']
-            maintenance_request.status = new_status
-            maintenance_request.save()
+            old_status = maintenance_request.status
+            if new_status != old_status:
+                expected_version = maintenance_request.version
+                maintenance_request.status = new_status
+                with routers.atomic(MaintenanceRequest, RequestEvent):
+                    # The transition was validated against the version read above
+                    if not maintenance_request.save_changes(['status'], expected_version):
+                        raise PreconditionFailed()
+                    RequestEvent.record(
+                        maintenance_request, 'STATUS_CHANGED',
+                        from_status=old_status, actor=request.user
+                    )
             
             # Return updated request
             response_serializer = MaintenanceRequestSerializer(maintenance_request)
@@ -104,6 +665,7 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         Validates that technician belongs to request's team.
         """
         maintenance_request = self.get_object()
+        check_if_match(request, maintenance_request)
         serializer = TechnicianAssignSerializer(
             data=request.data,
             context={'request_obj': maintenance_request}
@@ -111,8 +673,13 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             technician = serializer.validated_data['technician']
-            maintenance_request.technician = technician
-            maintenance_request.save()
+            if technician.id != maintenance_request.technician_id:
+                expected_version = maintenance_request.version
+                maintenance_request.technician = technician
+                with routers.atomic(MaintenanceRequest, RequestEvent):
+                    if not maintenance_request.save_changes(['technician'], expected_version):
+                        raise PreconditionFailed()
+                    RequestEvent.record(maintenance_request, 'ASSIGNED', actor=request.user)
             
             # Return updated request
             response_serializer = MaintenanceRequestSerializer(maintenance_request)
@@ -120,8 +687,101 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], url_path='board')
+    def board(self, request):
+        """
+        Kanban board: the newest cards per status column with column totals.
+
+        Without ?status the whole board comes from one windowed query.
+        ?status=<column>&cursor=<next_cursor> loads more cards for one column.
+        Accepts the same filters as list (except status) plus ?limit=.
+        """
+        query = BoardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        limit = query.validated_data['limit']
+        queryset = filter_requests(self.get_queryset(), request.query_params)
+
+        if 'cursor' in query.validated_data:
+            position = decode_board_cursor(query.validated_data['cursor'])
+            if position is None:
+                return Response({'cursor': ['Invalid cursor.']}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({'columns': [self._board_column_page(queryset, position, limit)]})
+
+        cards = queryset.annotate(
+            column_position=Window(
+                RowNumber(),
+                partition_by=F('status'),
+                order_by=[F('created_at').desc(), F('id').desc()]
+            ),
+            column_count=Window(Count('id'), partition_by=F('status')),
+        ).filter(column_position__lte=limit).order_by('status', 'column_position')
+
+        by_status = {}
+        for card in cards:
+            by_status.setdefault(card.status, []).append(card)
+
+        statuses = MaintenanceRequest.STATUS_CHOICES
+        if 'status' in request.query_params:
+            statuses = [c for c in statuses if c[0] == request.query_params['status']]
+
+        columns = []
+        for value, label in statuses:
+            column_cards = by_status.get(value, [])
+            count = column_cards[0].column_count if column_cards else 0
+            columns.append({
+                'status': value,
+                'label': label,
+                'count': count,
+                'results': MaintenanceRequestSerializer(column_cards, many=True).data,
+                'next_cursor': (
+                    encode_board_cursor(column_cards[-1])
+                    if len(column_cards) < count else None
+                ),
+            })
+        return Response({'columns': columns})
+
+    @action(detail=False, methods=['get'], url_path='overdue')
+    def overdue(self, request):
+        """
+        Open requests past their scheduled date + duration, most overdue first.
+
+        Accepts the same filters as list plus ?escalated=true|false. Served
+        from the (status, due_at) index, so closed history is never read.
+        """
+        query = OverdueQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        queryset = filter_requests(
+            self.filter_site(overdue_requests().select_related(*REQUEST_RELATED_FIELDS)),
+            request.query_params
+        )
+        if query.validated_data['escalated'] is not None:
+            queryset = queryset.filter(escalated_at__isnull=not query.validated_data['escalated'])
+
+        page = self.paginate_queryset(queryset.order_by('due_at', 'id'))
+        return self.get_paginated_response(MaintenanceRequestSerializer(page, many=True).data)
+
+    def _board_column_page(self, queryset, position, limit):
+        """Keyset page of one status column after the cursor position."""
+        created_at, pk = position
+        count = queryset.count()
+        cards = list(
+            queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            ).order_by('-created_at', '-id')[:limit + 1]
+        )
+        has_more = len(cards) > limit
+        cards = cards[:limit]
+        value = self.request.query_params['status']
+        return {
+            'status': value,
+            'label': dict(MaintenanceRequest.STATUS_CHOICES)[value],
+            'count': count,
+            'results': MaintenanceRequestSerializer(cards, many=True).data,
+            'next_cursor': encode_board_cursor(cards[-1]) if has_more else None,
+        }
+
 
-class CalendarViewSet(viewsets.ViewSet):
+class CalendarViewSet(SiteScopedMixin, viewsets.ViewSet):
     """
     API endpoint for calendar view of preventive maintenance.
     
@@ -131,9 +791,9 @@ class CalendarViewSet(viewsets.ViewSet):
     def list(self, request):
         """Get all preventive maintenance requests as calendar events."""
         # Filter for preventive requests only
-        preventive_requests = MaintenanceRequest.objects.filter(
+        preventive_requests = self.filter_site(MaintenanceRequest.objects.filter(
             request_type='PREVENTIVE'
-        ).select_related('equipment', 'technician', 'team')
+        ).select_related('equipment', 'technician', 'team'))
         
         # Format as calendar events
         events = []
@@ -155,3 +815,255 @@ class CalendarViewSet(viewsets.ViewSet):
         
         serializer = CalendarEventSerializer(events, many=True)
         return Response(serializer.data)
+
+
+class AnalyticsViewSet(SiteScopedMixin, viewsets.ViewSet):
+    """
+    API endpoint for maintenance analytics.
+
+    list: Get MTTR, failures and corrective/preventive ratio per equipment,
+          team, department or location (?group_by=&start=&end=)
+    """
+
+    def list(self, request):
+        """Get rollup-backed analytics for the requested grouping and date range."""
+        serializer = AnalyticsQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        summary = analytics.summarize(
+            group_by=params['group_by'],
+            start=params.get('start'),
+            end=params.get('end'),
+            site=self.site,
+        )
+        return Response({
+            'group_by': params['group_by'],
+            'start': params.get('start'),
+            'end': params.get('end'),
+            **summary,
+        })
+
+
+class CapacityViewSet(SiteScopedMixin, viewsets.ViewSet):
+    """
+    API endpoint for team and technician capacity forecasting.
+
+    list: Get planned vs available hours per team and technician in day or
+          week buckets (?bucket=day|week&weeks=12&start=)
+    """
+
+    def list(self, request):
+        """Get the capacity forecast for open scheduled requests."""
+        serializer = CapacityQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        return Response(capacity.forecast(
+            start=params.get('start') or timezone.localdate(),
+            weeks=params['weeks'],
+            bucket=params['bucket'],
+            site=self.site,
+        ))
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for background jobs.
+
+    list: Get jobs, newest first (?status=, ?kind=)
+    create: Enqueue a job ({"kind": ..., "params": {...}})
+    retrieve: Get a job's status, progress and result
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in ('status', 'kind'):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def create(self, request):
+        """Queue a job for the worker (python manage.py run_worker)."""
+        serializer = JobCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        job = jobs.enqueue(**serializer.validated_data)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class RequestProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for request profiles (staff only).
+
+    list: Get profiles, newest first, with timings and their slowest SQL (?path=)
+    retrieve: Get one profile
+    download: Get the profile data, a .prof file (cProfile) or folded stacks (sample)
+    """
+    queryset = RequestProfile.objects.defer('stats', 'folded')
+    serializer_class = RequestProfileSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        path = self.request.query_params.get('path')
+        if path:
+            queryset = queryset.filter(path__startswith=path)
+        return queryset
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, pk=None):
+        """Download the profile for snakeviz / pstats or a flame graph tool."""
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if profile.mode == 'sample':
+            response = HttpResponse(profile.folded, content_type='text/plain; charset=utf-8')
+            filename = f'profile-{profile.pk}.folded'
+        else:
+            response = HttpResponse(bytes(profile.stats), content_type='application/octet-stream')
+            filename = f'profile-{profile.pk}.prof'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    API endpoint for runtime counters of the worker serving the request.
+
+    list: Get single-flight coalescing and throttling counters, and the startup breakdown
+    """
+
+    def list(self, request):
+        """Get this worker's counters."""
+        return Response({
+            'single_flight': singleflight.stats(),
+            'throttled': throttling.stats(),
+            'startup': warmup.stats(),
+        })
+
+
+def _committed_events(site_code=None):
+    """
+    Events old enough that every event with a lower ID has committed, of
+    requests in the given site if one is named.
+
+    IDs are taken at insert time, but on PostgreSQL concurrent transactions
+    can commit out of ID order, and a cursor that moved past a higher ID would
+    never see the lower one. Holding back events younger than
+    EVENT_FEED_COMMIT_LAG closes that gap for transactions shorter than the
+    lag. SQLite serializes writers, so there IDs always commit in order.
+    """
+    events = RequestEvent.objects.all()
+    if site_code:
+        events = events.filter(site=site_code)
+    lag = settings.EVENT_FEED_COMMIT_LAG
+    if not lag:
+        return events
+    return events.filter(created_at__lte=timezone.now() - timedelta(seconds=lag))
+
+
+def _parse_event_id(value):
+    """Parse an event cursor, returning None when it is not a valid ID."""
+    try:
+        event_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return event_id if event_id >= 0 else None
+
+
+class RequestEventViewSet(SiteScopedMixin, viewsets.ViewSet):
+    """
+    API endpoint for the maintenance request change feed.
+
+    list: Get events after ?since=<event_id> (omit since to get the current cursor),
+          of one site's requests with X-Site or ?site=
+    """
+    default_limit = 100
+    max_limit = 500
+
+    def list(self, request):
+        """Get events newer than the given cursor."""
+        if 'since' not in request.query_params:
+            latest = _committed_events(self.site_code).order_by('-id').values_list('id', flat=True).first()
+            return Response({'events': [], 'last_event_id': latest or 0, 'has_more': False})
+
+        since = _parse_event_id(request.query_params['since'])
+        if since is None:
+            return Response(
+                {'since': 'Must be a non-negative integer event ID.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = _parse_event_id(request.query_params.get('limit')) or self.default_limit
+        limit = min(limit, self.max_limit)
+
+        events = list(
+            _committed_events(self.site_code).filter(id__gt=since)
+            .select_related('technician')[:limit + 1]
+        )
+        has_more = len(events) > limit
+        events = events[:limit]
+
+        serializer = RequestEventSerializer(events, many=True)
+        return Response({
+            'events': serializer.data,
+            'last_event_id': events[-1].id if events else since,
+            'has_more': has_more,
+        })
+
+
+async def request_event_stream(request):
+    """
+    Server-Sent Events stream of maintenance request changes.
+
+    Only available under the ASGI application; WSGI clients should poll
+    /api/events/?since=<event_id> instead. Resumes from the Last-Event-ID
+    header or ?since=, otherwise starts at the newest event. X-Site or ?site=
+    limits it to one site's requests.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'Event stream requires the ASGI server. Poll /api/events/?since= instead.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+
+    site_code = request.headers.get('X-Site') or request.GET.get('site') or None
+    since = _parse_event_id(request.headers.get('Last-Event-ID', request.GET.get('since')))
+    if since is None:
+        latest = await _committed_events(site_code).order_by('-id').values_list('id', flat=True).afirst()
+        since = latest or 0
+
+    poll_interval = settings.EVENT_STREAM_POLL_INTERVAL
+    heartbeat = settings.EVENT_STREAM_HEARTBEAT
+    renderer = JSONRenderer()
+
+    async def stream():
+        last_id = since
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_DURATION
+        last_sent = time.monotonic()
+        yield f'retry: {int(poll_interval * 1000)}\n\n'
+        while time.monotonic() < deadline:
+            events = [
+                event async for event in
+                _committed_events(site_code).filter(id__gt=last_id).select_related('technician')[:100]
+            ]
+            for event in events:
+                data = renderer.render(RequestEventSerializer(event).data).decode()
+                yield f'id: {event.id}\nevent: {event.event_type.lower()}\ndata: {data}\n\n'
+                last_id = event.id
+            if events:
+                last_sent = time.monotonic()
+                continue
+            if time.monotonic() - last_sent >= heartbeat:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            await asyncio.sleep(poll_interval)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,191 @@
+"""
+Worker warm-up.
+
+gearguard/wsgi.py and asgi.py call warm_up() once the application is built,
+so a new worker pays its one-time costs before taking traffic instead of on
+its first requests:
+
+- urls: import and resolve the URLconf. This imports every view and DRF,
+  and builds the router patterns.
+- serializers: build the fields of every serializer. This fills Django's
+  model _meta caches and imports the DRF field and relation machinery.
+- databases: connect to each configured database.
+- caches: touch each cache backend, the facet generation key and the
+  throttle store and rates.
+- requests: send GETs for WARMUP_PATHS through a WSGI handler, so the
+  middleware, view, pagination and rendering paths have all run once.
+
+Each stage is timed and a failing stage is recorded and skipped, so warm-up
+never prevents a worker from starting. The breakdown is logged and served
+under "startup" on /api/metrics/.
+"""
+import asyncio
+import io
+import logging
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+_startup = {}
+
+
+def stats():
+    """Startup-time breakdown of this worker process, in milliseconds."""
+    return dict(_startup)
+
+
+def _warm_urls():
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.resolve('/api/')
+    return len(resolver.reverse_dict)
+
+
+def _warm_serializers():
+    from rest_framework import serializers as drf_serializers
+    from . import serializers
+
+    built = 0
+    for value in vars(serializers).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, drf_serializers.BaseSerializer)
+            and value.__module__ == serializers.__name__
+        ):
+            value().fields
+            built += 1
+    return built
+
+
+def _warm_databases():
+    from django.db import connections
+
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def _warm_caches():
+    from django.core.cache import caches
+    from rest_framework.settings import api_settings
+    from . import facets, throttling
+
+    for cache in caches.all():
+        cache.get('warmup')
+    facets._generation()
+    throttling.get_store()
+    for rate in api_settings.DEFAULT_THROTTLE_RATES.values():
+        if rate:
+            throttling.parse_rate(rate)
+    return len(caches.all())
+
+
+def _warm_host():
+    """A host name the app accepts, for the warm-up requests."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def _warm_requests(application):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    # ASGI workers share the URLconf, views and serializers with this handler
+    handler = application if isinstance(application, WSGIHandler) else WSGIHandler()
+    statuses = {}
+    for path in settings.WARMUP_PATHS:
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': _warm_host(),
+            'SERVER_PORT': '80',
+            'HTTP_HOST': _warm_host(),
+            'HTTP_ACCEPT': 'application/json',
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http',
+        }
+        started = []
+        response = handler(environ, lambda status, headers, exc_info=None: started.append(status))
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        statuses[path] = int(started[0].split()[0]) if started else None
+    return statuses
+
+
+STAGES = [
+    ('urls', _warm_urls),
+    ('serializers', _warm_serializers),
+    ('databases', _warm_databases),
+    ('caches', _warm_caches),
+]
+
+
+def _run_stages(application, close_connections=False):
+    stages = [*STAGES, ('requests', lambda: _warm_requests(application))]
+    for name, stage in stages:
+        stage_started = time.perf_counter()
+        try:
+            result = stage()
+        except Exception as exc:
+            logger.warning('Warm-up stage %s failed: %s', name, exc)
+            _startup[f'{name}_error'] = str(exc)
+        else:
+            if name == 'requests':
+                _startup['request_statuses'] = result
+        _startup[f'{name}_ms'] = round((time.perf_counter() - stage_started) * 1000, 1)
+    if close_connections:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def warm_up(application, started_at=None):
+    """
+    Run the warm-up stages and record how long each took.
+
+    started_at is the perf_counter() reading taken before the application was
+    built, so the breakdown includes django.setup() and middleware loading.
+    """
+    now = time.perf_counter()
+    if started_at is not None:
+        _startup['setup_ms'] = round((now - started_at) * 1000, 1)
+    if not settings.WARMUP_ENABLED:
+        return application
+
+    if _in_event_loop():
+        # ASGI servers such as uvicorn import the app inside their event loop,
+        # where Django refuses synchronous database access
+        thread = threading.Thread(target=_run_stages, args=(application, True), name='warmup')
+        thread.start()
+        thread.join()
+    else:
+        _run_stages(application)
+
+    _startup['warmup_ms'] = round((time.perf_counter() - now) * 1000, 1)
+    if started_at is not None:
+        _startup['total_ms'] = round((time.perf_counter() - started_at) * 1000, 1)
+    logger.info('Worker warmed up: %s', _startup)
+    return application
@@ -13,6 +13,9 @@ import {
 
 const API_BASE_URL = 'http://127.0.0.1:8000/api';
 
+// Users shown by a picker at once; the server caps ?page_size= at 100
+export const USER_PAGE_SIZE = 100;
+
 class ApiClient {
   private async request<T>(
     endpoint: string,
@@ -82,8 +85,15 @@ class ApiClient {
     });
   }
 
-  async getEquipmentRequests(equipmentId: number): Promise<MaintenanceRequest[]> {
-    return this.request(`/equipment/${equipmentId}/requests/`);
+  async getEquipmentRequests(equipmentId: number, page = 1): Promise<PaginatedResponse<MaintenanceRequest>> {
+    const response = await this.request<PaginatedResponse<MaintenanceRequest> | MaintenanceRequest[]>(
+      `/equipment/${equipmentId}/requests/?page=${page}`
+    );
+    // Handle both paginated and non-paginated responses
+    if (Array.isArray(response)) {
+      return { count: response.length, next: null, previous: null, results: response };
+    }
+    return response;
   }
 
   // Teams endpoints
@@ -120,9 +130,16 @@ class ApiClient {
     });
   }
 
-  // Users endpoint (for team member selection)
-  async getUsers(): Promise<User[]> {
-    return this.request('/users/');
+  // Users endpoint (for team member selection): one page of matches, narrowed with ?search=
+  async getUsers(search = '', pageSize = USER_PAGE_SIZE): Promise<PaginatedResponse<User>> {
+    const searchParams = new URLSearchParams({ page_size: String(pageSize) });
+    if (search) searchParams.append('search', search);
+    const response = await this.request<PaginatedResponse<User> | User[]>(`/users/?${searchParams}`);
+    // Handle both paginated and non-paginated responses
+    if (Array.isArray(response)) {
+      return { count: response.length, next: null, previous: null, results: response };
+    }
+    return response;
   }
 
   // Maintenance Requests endpoints
@@ -1,5 +1,5 @@
 import { useParams, useNavigate, Link } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { api, ApiError } from '@/lib/api';
 import { PageHeader } from '@/components/layout/PageHeader';
 import { LoadingState } from '@/components/ui/loading';
@@ -34,11 +34,20 @@ export default function EquipmentDetailPage() {
     enabled: !!id,
   });
 
-  const { data: requests } = useQuery({
+  const {
+    data: requestPages,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['equipment', id, 'requests'],
-    queryFn: () => api.getEquipmentRequests(Number(id)),
+    queryFn: ({ pageParam }) => api.getEquipmentRequests(Number(id), pageParam),
+    initialPageParam: 1,
+    getNextPageParam: (lastPage, pages) => (lastPage.next ? pages.length + 1 : undefined),
     enabled: !!id,
   });
+  const requests = requestPages?.pages.flatMap((page) => page.results);
+  const requestCount = requestPages?.pages[0]?.count ?? 0;
 
   const deleteMutation = useMutation({
     mutationFn: () => api.deleteEquipment(Number(id)),
@@ -171,45 +180,65 @@ export default function EquipmentDetailPage() {
         {/* Maintenance History */}
         <Card>
           <CardHeader>
-            <CardTitle>Maintenance History</CardTitle>
+            <CardTitle>
+              Maintenance History
+              {requests && requestCount > requests.length && (
+                <span className="ml-2 text-sm font-normal text-muted-foreground">
+                  Showing {requests.length} of {requestCount}
+                </span>
+              )}
+            </CardTitle>
           </CardHeader>
           <CardContent className="p-0">
             {requests && requests.length > 0 ? (
-              <Table>
-                <TableHeader>
-                  <TableRow>
-                    <TableHead>Subject</TableHead>
-                    <TableHead>Type</TableHead>
-                    <TableHead>Status</TableHead>
-                    <TableHead>Scheduled</TableHead>
-                    <TableHead>Technician</TableHead>
-                  </TableRow>
-                </TableHeader>
-                <TableBody>
-                  {requests.map((request) => (
-                    <TableRow key={request.id}>
-                      <TableCell>
-                        <Link 
-                          to={`/requests/${request.id}`}
-                          className="font-medium hover:underline"
-                        >
-                          {request.subject}
-                        </Link>
-                      </TableCell>
-                      <TableCell>
-                        <TypeBadge type={request.request_type} />
-                      </TableCell>
-                      <TableCell>
-                        <StatusBadge status={request.status} />
-                      </TableCell>
-                      <TableCell>
-                        {format(new Date(request.scheduled_date), 'MMM d, yyyy')}
-                      </TableCell>
-                      <TableCell>{request.technician_name || '—'}</TableCell>
+              <>
+                <Table>
+                  <TableHeader>
+                    <TableRow>
+                      <TableHead>Subject</TableHead>
+                      <TableHead>Type</TableHead>
+                      <TableHead>Status</TableHead>
+                      <TableHead>Scheduled</TableHead>
+                      <TableHead>Technician</TableHead>
                     </TableRow>
-                  ))}
-                </TableBody>
-              </Table>
+                  </TableHeader>
+                  <TableBody>
+                    {requests.map((request) => (
+                      <TableRow key={request.id}>
+                        <TableCell>
+                          <Link 
+                            to={`/requests/${request.id}`}
+                            className="font-medium hover:underline"
+                          >
+                            {request.subject}
+                          </Link>
+                        </TableCell>
+                        <TableCell>
+                          <TypeBadge type={request.request_type} />
+                        </TableCell>
+                        <TableCell>
+                          <StatusBadge status={request.status} />
+                        </TableCell>
+                        <TableCell>
+                          {format(new Date(request.scheduled_date), 'MMM d, yyyy')}
+                        </TableCell>
+                        <TableCell>{request.technician_name || '—'}</TableCell>
+                      </TableRow>
+                    ))}
+                  </TableBody>
+                </Table>
+                {hasNextPage && (
+                  <div className="p-4 text-center">
+                    <Button
+                      variant="outline"
+                      onClick={() => fetchNextPage()}
+                      disabled={isFetchingNextPage}
+                    >
+                      {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                    </Button>
+                  </div>
+                )}
+              </>
             ) : (
               <div className="p-6 text-center text-sm text-muted-foreground">
                 No maintenance requests for this equipment.
@@ -1,5 +1,5 @@
 import { useParams, useNavigate } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useMutation, useQueryClient, keepPreviousData } from '@tanstack/react-query';
 import { useForm } from 'react-hook-form';
 import { zodResolver } from '@hookform/resolvers/zod';
 import { z } from 'zod';
@@ -21,6 +21,7 @@ import {
 } from '@/components/ui/select';
 import { ArrowLeft, Save } from 'lucide-react';
 import { useToast } from '@/hooks/use-toast';
+import { useDebouncedValue } from '@/hooks/use-debounced-value';
 import { useEffect, useState } from 'react';
 
 const equipmentSchema = z.object({
@@ -42,6 +43,8 @@ export default function EquipmentFormPage() {
   const { toast } = useToast();
   const queryClient = useQueryClient();
   const [apiErrors, setApiErrors] = useState<Record<string, string>>({});
+  const [technicianSearch, setTechnicianSearch] = useState('');
+  const debouncedTechnicianSearch = useDebouncedValue(technicianSearch.trim());
 
   const { data: equipment, isLoading: loadingEquipment } = useQuery({
     queryKey: ['equipment', id],
@@ -54,9 +57,11 @@ export default function EquipmentFormPage() {
     queryFn: () => api.getTeams(),
   });
 
-  const { data: users } = useQuery({
-    queryKey: ['users'],
-    queryFn: () => api.getUsers(),
+  // One bounded page of users; typing narrows it on the server instead of loading everyone
+  const { data: usersPage } = useQuery({
+    queryKey: ['users', debouncedTechnicianSearch],
+    queryFn: () => api.getUsers(debouncedTechnicianSearch),
+    placeholderData: keepPreviousData,
   });
 
   const {
@@ -82,11 +87,16 @@ export default function EquipmentFormPage() {
   });
 
   const selectedTeamId = watch('default_team');
+  const selectedTechnicianId = watch('default_technician');
 
   // Filter technicians by selected team
   const availableTechnicians = selectedTeamId && teams
     ? teams.find(t => t.id === selectedTeamId)?.members || []
-    : users || [];
+    : usersPage?.results || [];
+  // The saved technician may be outside the loaded page; keep it selectable
+  const missingTechnician = !!selectedTechnicianId
+    && selectedTechnicianId === equipment?.default_technician
+    && !availableTechnicians.some((user) => user.id === selectedTechnicianId);
 
   useEffect(() => {
     if (equipment) {
@@ -274,6 +284,13 @@ export default function EquipmentFormPage() {
 
                 <div className="space-y-2">
                   <Label>Default Technician</Label>
+                  {!selectedTeamId && (
+                    <Input
+                      value={technicianSearch}
+                      onChange={(event) => setTechnicianSearch(event.target.value)}
+                      placeholder="Search technicians"
+                    />
+                  )}
                   <Select
                     value={watch('default_technician')?.toString() || ''}
                     onValueChange={(value) =>
@@ -284,6 +301,11 @@ export default function EquipmentFormPage() {
                       <SelectValue placeholder="Select a technician" />
                     </SelectTrigger>
                     <SelectContent>
+                      {missingTechnician && (
+                        <SelectItem value={String(selectedTechnicianId)}>
+                          {equipment?.default_technician_name}
+                        </SelectItem>
+                      )}
                       {availableTechnicians.map((user) => (
                         <SelectItem key={user.id} value={user.id.toString()}>
                           {user.first_name} {user.last_name} ({user.username})
@@ -291,10 +313,14 @@ export default function EquipmentFormPage() {
                       ))}
                     </SelectContent>
                   </Select>
-                  {selectedTeamId && (
+                  {selectedTeamId ? (
                     <p className="text-xs text-muted-foreground">
                       Showing team members only
                     </p>
+                  ) : usersPage && usersPage.count > usersPage.results.length && (
+                    <p className="text-xs text-muted-foreground">
+                      Showing {usersPage.results.length} of {usersPage.count} users. Search to find others.
+                    </p>
                   )}
                 </div>
               </div>
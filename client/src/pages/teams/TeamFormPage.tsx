@@ -1,10 +1,10 @@
 import { useParams, useNavigate } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useMutation, useQueryClient, keepPreviousData } from '@tanstack/react-query';
 import { useForm } from 'react-hook-form';
 import { zodResolver } from '@hookform/resolvers/zod';
 import { z } from 'zod';
 import { api, ApiError } from '@/lib/api';
-import { TeamFormData, User } from '@/types';
+import { TeamFormData } from '@/types';
 import { PageHeader } from '@/components/layout/PageHeader';
 import { LoadingState } from '@/components/ui/loading';
 import { Button } from '@/components/ui/button';
@@ -14,6 +14,7 @@ import { Checkbox } from '@/components/ui/checkbox';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card';
 import { ArrowLeft, Save } from 'lucide-react';
 import { useToast } from '@/hooks/use-toast';
+import { useDebouncedValue } from '@/hooks/use-debounced-value';
 import { useEffect, useState } from 'react';
 
 const teamSchema = z.object({
@@ -28,6 +29,8 @@ export default function TeamFormPage() {
   const { toast } = useToast();
   const queryClient = useQueryClient();
   const [apiErrors, setApiErrors] = useState<Record<string, string>>({});
+  const [userSearch, setUserSearch] = useState('');
+  const debouncedUserSearch = useDebouncedValue(userSearch.trim());
 
   const { data: team, isLoading: loadingTeam } = useQuery({
     queryKey: ['team', id],
@@ -35,10 +38,13 @@ export default function TeamFormPage() {
     enabled: isEditing,
   });
 
-  const { data: users, isLoading: loadingUsers } = useQuery({
-    queryKey: ['users'],
-    queryFn: () => api.getUsers(),
+  // One bounded page of users; typing narrows it on the server instead of loading everyone
+  const { data: usersPage, isLoading: loadingUsers } = useQuery({
+    queryKey: ['users', debouncedUserSearch],
+    queryFn: () => api.getUsers(debouncedUserSearch),
+    placeholderData: keepPreviousData,
   });
+  const users = usersPage?.results;
 
   const {
     register,
@@ -153,6 +159,12 @@ export default function TeamFormPage() {
               </CardDescription>
             </CardHeader>
             <CardContent>
+              <Input
+                className="mb-3"
+                value={userSearch}
+                onChange={(event) => setUserSearch(event.target.value)}
+                placeholder="Search by name, username or email"
+              />
               {users && users.length > 0 ? (
                 <div className="space-y-2 max-h-80 overflow-auto">
                   {users.map((user) => (
@@ -177,7 +189,14 @@ export default function TeamFormPage() {
                   ))}
                 </div>
               ) : (
-                <p className="text-sm text-muted-foreground">No users available.</p>
+                <p className="text-sm text-muted-foreground">
+                  {debouncedUserSearch ? 'No users match this search.' : 'No users available.'}
+                </p>
+              )}
+              {usersPage && usersPage.count > usersPage.results.length && (
+                <p className="mt-3 text-xs text-muted-foreground">
+                  Showing {usersPage.results.length} of {usersPage.count} users. Search to find others.
+                </p>
               )}
               <p className="mt-3 text-sm text-muted-foreground">
                 {selectedMembers?.length || 0} member{selectedMembers?.length !== 1 ? 's' : ''} selected